@@ -6,6 +6,13 @@ Simple feature flag and A/B testing client for SetBit.
 
 from .client import SetBit
 from .exceptions import SetBitError, SetBitAuthError, SetBitAPIError
+from .snapshot import Snapshot
+from .tracing import EvaluationRecord, Hook
+from .transport import Transport, RequestsTransport, HTTP2Transport, InMemoryTransport
 
 __version__ = "0.1.0"
-__all__ = ["SetBit", "SetBitError", "SetBitAuthError", "SetBitAPIError"]
+__all__ = [
+    "SetBit", "SetBitError", "SetBitAuthError", "SetBitAPIError", "Snapshot",
+    "Transport", "RequestsTransport", "HTTP2Transport", "InMemoryTransport",
+    "Hook", "EvaluationRecord",
+]
@@ -1,15 +1,40 @@
 """
 SetBit Python SDK - Main Client
 """
+import functools
+import json
 import logging
-from typing import Dict, Any, Optional
-import requests
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from collections import deque
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar,
+)
 
+from .encoding import (
+    BATCH_FORMATS, BATCH_FORMAT_HEADER, COMPRESSIONS, FORMAT_JSON, NDJSON_CONTENT_TYPE,
+    compress_stream, encode_batch,
+)
 from .exceptions import SetBitError, SetBitAuthError, SetBitAPIError
+from .exposure import EXPOSURE_EVENT, ExposureCache
+from .latency import LatencyTracker, RETRYABLE_STATUS_CODES, backoff_delay, first_result
+from .snapshot import Snapshot, SnapshotSource
+from .tracing import (
+    NULL_TRACE, SOURCE_DEFAULT, SOURCE_NETWORK, SOURCE_QUEUE, SOURCE_SNAPSHOT, BaseTrace,
+    HookLike, Tracer,
+)
+from .transport import RequestsTransport, Response, Transport
 
 
 logger = logging.getLogger(__name__)
 
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class SetBit:
     """
@@ -25,7 +50,30 @@ class SetBit:
         self,
         api_key: str,
         tags: Optional[Dict[str, str]] = None,
-        base_url: str = "https://flags.setbit.io"
+        base_url: str = "https://flags.setbit.io",
+        batch_size: int = 0,
+        batch_format: str = FORMAT_JSON,
+        compression: Optional[str] = "gzip",
+        compress_threshold: int = 1024,
+        max_queue_size: int = 10000,
+        record_exposures: bool = False,
+        exposure_window: float = 3600.0,
+        exposure_cache_size: int = 10000,
+        sample_rates: Optional[Dict[str, float]] = None,
+        transport: Optional[Transport] = None,
+        snapshot: Optional[SnapshotSource] = None,
+        serverless: bool = False,
+        timeout: float = 5.0,
+        deadline: Optional[float] = None,
+        hedge: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 0,
+        retry_budget: float = 10.0,
+        hooks: Optional[List[HookLike]] = None,
+        trace_sample_rate: float = 1.0,
+        warm_up: bool = False,
+        warm_up_timeout: float = 60.0,
+        refresh_interval: Optional[float] = 30.0
     ):
         """
         Initialize SetBit client.
@@ -34,18 +82,275 @@ class SetBit:
             api_key: SetBit API key (required)
             tags: Dictionary of tags for targeting (env, app, team, region, etc.)
             base_url: API endpoint base URL
+            batch_size: Queue tracked events and upload them in batches of this
+                        size (0 sends every event immediately)
+            batch_format: Wire format for batch uploads: "json" (one request per
+                          event), "ndjson" or "columnar"
+            compression: "gzip", "deflate" or None for batch uploads
+            compress_threshold: Batch uploads larger than this many bytes are compressed
+            max_queue_size: Maximum number of queued events; once reached, the
+                            oldest event is dropped and counted in dropped_events
+            record_exposures: Queue a "$exposure" event when variant() assigns a user;
+                              it is sent with the next tracked event, by
+                              flush()/close(), or by a background flush once
+                              batch_size events are queued
+            exposure_window: Seconds during which a repeated (user, flag, variant)
+                             exposure is not tracked again
+            exposure_cache_size: Maximum number of exposures remembered for de-duplication
+            sample_rates: Fraction (0.0-1.0) of events to keep per event name; kept
+                          events carry a weight of 1 / rate
+            transport: HTTP transport (defaults to a pooled HTTP/1.1 RequestsTransport)
+            snapshot: Flag definitions (dict or path to a JSON file) evaluated locally;
+                      flags missing from it are evaluated via the API
+            serverless: Evaluate only from the snapshot and queue every tracked
+                        event until flush() (see handler())
+            timeout: Timeout in seconds for each HTTP request
+            deadline: Total seconds enabled()/variant() may spend on the network,
+                      including connection setup, before returning the default
+            hedge: Send a second evaluation request when the first hasn't answered
+                   by the p95 of recent latencies, and use whichever answers first
+            max_concurrency: Number of threads expected to call enabled()/variant()
+                             at once with a deadline or hedging. The worker pool
+                             holds one worker per caller, two with hedging, and
+                             callers beyond it wait for a worker within their
+                             deadline. Defaults to the transport's connection
+                             pool size, or 16
+            max_retries: Retries for failed uploads by flush(), close() and
+                         background flushes (network errors, 429, 5xx). Uploads
+                         made inside track(), including the flush of a full
+                         batch, are sent once so track() never sleeps
+            retry_budget: Total seconds one upload may spend retrying, backoff included
+            hooks: Tracing hooks (Hook instances or callables) receiving an
+                   EvaluationRecord for every enabled(), variant() and track() call
+            trace_sample_rate: Fraction (0.0-1.0) of calls reported to hooks
+            warm_up: Run warm_up() in a background thread; see is_ready and
+                     wait_until_ready()
+            warm_up_timeout: Seconds the background warm-up keeps retrying failed
+                             attempts, with backoff, before giving up
+            refresh_interval: Seconds between background refresh() calls once
+                              warm_up() has loaded flags, so flag changes (e.g.
+                              kill switches) are picked up; None freezes the
+                              flags loaded by warm_up()
 
         Raises:
-            SetBitError: If API key is missing
+            SetBitError: If API key is missing, options are invalid or the
+                         snapshot can't be loaded
         """
         if not api_key:
             raise SetBitError("API key is required")
 
+        if batch_format not in BATCH_FORMATS:
+            raise SetBitError(f"Unknown batch format: {batch_format}")
+
+        if compression is not None and compression not in COMPRESSIONS:
+            raise SetBitError(f"Unknown compression: {compression}")
+
+        if serverless and snapshot is None:
+            raise SetBitError("Serverless mode requires a flag snapshot")
+
+        for event_name, rate in (sample_rates or {}).items():
+            if not 0.0 <= rate <= 1.0:
+                raise SetBitError(f"Sample rate for '{event_name}' must be between 0 and 1")
+
         self.api_key = api_key
         self.tags = tags or {}
         self.base_url = base_url.rstrip('/')
+        self.transport = transport or RequestsTransport()
+        self.snapshot = Snapshot.load(snapshot) if snapshot is not None else None
+        self.serverless = serverless
+        self.batch_size = batch_size
+        self.batch_format = batch_format
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.max_queue_size = max_queue_size
+        self.dropped_events = 0
+        self._event_queue: List[Dict[str, Any]] = []
+        self._queue_lock = threading.Lock()
+        self._flushing_in_background = False
+        self.record_exposures = record_exposures
+        self.sample_rates = sample_rates or {}
+        self._exposures = ExposureCache(max_size=exposure_cache_size, window=exposure_window)
+        self.timeout = timeout
+        self.deadline = deadline
+        self.hedge = hedge
+        # Concurrent callers beyond the connection pool can't all be served on
+        # pooled connections anyway
+        if max_concurrency is None:
+            max_concurrency = getattr(self.transport, "pool_size", None) or 16
+        self.max_concurrency = max_concurrency
+        self._max_workers = max_concurrency * 2 if hedge else max_concurrency
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self._latencies = LatencyTracker()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._workers = threading.BoundedSemaphore(self._max_workers)
+        self._tracer = Tracer(hooks, trace_sample_rate)
+        self._ready = threading.Event()
+        self.refresh_interval = refresh_interval
+        self._closed = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+        # A bundled snapshot is enough to serve flags, unless a warm-up was
+        # requested to load fresh ones
+        if self.snapshot is not None and not warm_up:
+            self._ready.set()
+
+        if warm_up:
+            threading.Thread(
+                target=self._warm_up_in_background,
+                args=(warm_up_timeout,),
+                name="setbit-warm-up",
+                daemon=True
+            ).start()
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        True once flag data is loaded, so flag checks are answered locally.
+
+        Never blocks; suitable for readiness probes.
+        """
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until flag data is loaded.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the client is ready, False if the timeout expired
+        """
+        return self._ready.wait(timeout)
+
+    def warm_up(self, connections: int = 1) -> None:
+        """
+        Prepare the client for traffic, then mark it ready.
+
+        Opens pooled connections to the API, then loads the flag snapshot
+        with refresh(), which compiles experiment variant tables, and starts
+        refreshing it every refresh_interval seconds in the background. A
+        client created with a bundled snapshot in serverless mode skips all
+        three steps.
+
+        Args:
+            connections: Number of connections to open ahead of time
+
+        Raises:
+            SetBitAuthError: If API key is invalid
+            SetBitAPIError: If the API can't be reached
+        """
+        if not self.serverless:
+            self.transport.preconnect(self.base_url, connections, timeout=self.timeout)
+            self.refresh()
+            self._start_refresher()
+
+        self._ready.set()
+        logger.debug("SetBit client is ready")
+
+    def _start_refresher(self) -> None:
+        if self.refresh_interval is None or self._closed.is_set():
+            return
+
+        with self._executor_lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_periodically, name="setbit-refresh", daemon=True
+            )
+        self._refresher.start()
+
+    def _refresh_periodically(self) -> None:
+        """
+        Call refresh() every refresh_interval seconds until close(). A failed
+        refresh keeps the current snapshot and is retried at the next interval.
+        """
+        assert self.refresh_interval is not None
+        while not self._closed.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except SetBitError as e:
+                logger.error(f"Failed to refresh SetBit flags, keeping current flags: {e}")
+            except Exception as e:
+                logger.error(f"Unexpected error refreshing SetBit flags: {e}")
+
+    def _warm_up_in_background(self, timeout: float) -> None:
+        """
+        Run warm_up(), retrying failures with backoff until it succeeds or
+        timeout seconds have passed. An invalid API key is not retried.
+        """
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            try:
+                self.warm_up()
+                return
+            except SetBitAuthError as e:
+                logger.error(f"Failed to warm up SetBit client: {e}")
+                return
+            except SetBitError as e:
+                error: Exception = e
+            except Exception as e:
+                error = e
+
+            delay = backoff_delay(attempt)
+            if time.monotonic() - started + delay > timeout:
+                logger.error(f"Failed to warm up SetBit client, giving up: {error}")
+                return
+
+            logger.warning(f"Failed to warm up SetBit client, retrying: {error}")
+            if self._closed.wait(delay):
+                return
+            attempt += 1
 
-    def enabled(self, flag_name: str, user_id: str, default: bool = False) -> bool:
+    def refresh(self) -> None:
+        """
+        Load the current flag definitions from the API into the local snapshot.
+
+        Flags in the snapshot are then evaluated locally; others still go
+        to the API.
+
+        Raises:
+            SetBitAuthError: If API key is invalid
+            SetBitAPIError: If API request fails
+        """
+        url = f"{self.base_url}/v1/flags"
+
+        payload = {
+            "apiKey": self.api_key,
+            "tags": self.tags
+        }
+
+        response = self.transport.post(
+            url, data=json.dumps(payload).encode("utf-8"), headers=JSON_HEADERS,
+            timeout=self.timeout
+        )
+
+        if response.status_code == 401:
+            raise SetBitAuthError("Invalid API key")
+
+        if not response.ok:
+            raise SetBitAPIError(f"Failed to fetch flags: HTTP {response.status_code}")
+
+        try:
+            flags = response.json()
+        except ValueError as e:
+            raise SetBitAPIError(f"Invalid flags response: {e}") from e
+
+        self.snapshot = Snapshot(flags)
+        self._ready.set()
+        logger.debug(f"Loaded {len(self.snapshot)} flags")
+
+    def enabled(
+        self,
+        flag_name: str,
+        user_id: str,
+        default: bool = False,
+        deadline: Optional[float] = None
+    ) -> bool:
         """
         Check if a flag is enabled.
 
@@ -53,43 +358,45 @@ class SetBit:
             flag_name: Name of the flag to check
             user_id: User identifier (required for analytics and billing)
             default: Default value if flag not found or API fails
+            deadline: Seconds to wait for an answer before returning default
+                      (overrides the client deadline)
 
         Returns:
             True if flag is enabled, False otherwise
         """
-        try:
-            url = f"{self.base_url}/v1/evaluate"
+        return self._enabled(flag_name, user_id, default, deadline)
 
-            payload = {
-                "apiKey": self.api_key,
-                "userId": user_id,
-                "tags": self.tags,
-                "flagName": flag_name
-            }
-
-            response = requests.post(url, json=payload, timeout=5)
-
-            # Handle authentication errors
-            if response.status_code == 401:
-                logger.error(f"Invalid API key")
-                return default
-
-            # Handle other errors - fail open
-            if not response.ok:
-                logger.error(f"API error {response.status_code}, returning default: {default}")
-                return default
+    def _enabled(
+        self,
+        flag_name: str,
+        user_id: str,
+        default: bool = False,
+        deadline: Optional[float] = None,
+        use_pool: bool = True
+    ) -> bool:
+        trace = self._tracer.start("enabled", flag_name, user_id)
+        try:
+            result = self._evaluate(flag_name, user_id, deadline, trace, use_pool)
+            if result is None:
+                return trace.finish(default, SOURCE_DEFAULT)
 
-            result = response.json()
-            return result.get('enabled', default)
+            enabled: bool = result.get('enabled', default)
+            return trace.finish(enabled)
 
-        except requests.RequestException as e:
+        except SetBitAPIError as e:
             logger.error(f"Failed to evaluate flag '{flag_name}': {e}, returning default: {default}")
-            return default
+            return trace.finish(default, SOURCE_DEFAULT, e)
         except Exception as e:
             logger.error(f"Unexpected error evaluating flag '{flag_name}': {e}, returning default: {default}")
-            return default
+            return trace.finish(default, SOURCE_DEFAULT, e)
 
-    def variant(self, flag_name: str, user_id: str, default: str = "control") -> str:
+    def variant(
+        self,
+        flag_name: str,
+        user_id: str,
+        default: str = "control",
+        deadline: Optional[float] = None
+    ) -> str:
         """
         Get the variant for an A/B test experiment.
 
@@ -97,46 +404,341 @@ class SetBit:
             flag_name: Name of the experiment flag
             user_id: User identifier (required)
             default: Default variant if flag not found or API fails
+            deadline: Seconds to wait for an answer before returning default
+                      (overrides the client deadline)
 
         Returns:
             Variant name (e.g., "control", "variant_a", "variant_b")
         """
-        try:
-            url = f"{self.base_url}/v1/evaluate"
-
-            payload = {
-                "apiKey": self.api_key,
-                "userId": user_id,
-                "tags": self.tags,
-                "flagName": flag_name
-            }
-
-            response = requests.post(url, json=payload, timeout=5)
-
-            # Handle authentication errors
-            if response.status_code == 401:
-                logger.error(f"Invalid API key")
-                return default
-
-            # Handle other errors - fail open
-            if not response.ok:
-                logger.error(f"API error {response.status_code}, returning default: {default}")
-                return default
+        return self._variant(flag_name, user_id, default, deadline)
 
-            result = response.json()
+    def _variant(
+        self,
+        flag_name: str,
+        user_id: str,
+        default: str = "control",
+        deadline: Optional[float] = None,
+        use_pool: bool = True
+    ) -> str:
+        trace = self._tracer.start("variant", flag_name, user_id)
+        try:
+            result = self._evaluate(flag_name, user_id, deadline, trace, use_pool)
+            if result is None:
+                return trace.finish(default, SOURCE_DEFAULT)
 
             # If flag is disabled, return default
             if not result.get('enabled', False):
-                return default
+                return trace.finish(default)
+
+            assigned: str = result.get('variant', default)
 
-            return result.get('variant', default)
+            if self.record_exposures:
+                self._record_exposure(flag_name, user_id, assigned)
 
-        except requests.RequestException as e:
+            return trace.finish(assigned)
+
+        except SetBitAPIError as e:
             logger.error(f"Failed to get variant for '{flag_name}': {e}, returning default: {default}")
-            return default
+            return trace.finish(default, SOURCE_DEFAULT, e)
         except Exception as e:
             logger.error(f"Unexpected error getting variant for '{flag_name}': {e}, returning default: {default}")
-            return default
+            return trace.finish(default, SOURCE_DEFAULT, e)
+
+    def enabled_many(
+        self,
+        flag_name: str,
+        user_ids: Iterable[str],
+        default: bool = False,
+        max_workers: int = 8,
+        chunk_size: int = 100
+    ) -> Iterator[Tuple[str, bool]]:
+        """
+        Check a flag for many users.
+
+        Args:
+            flag_name: Name of the flag to check
+            user_ids: User identifiers; may be a generator
+            default: Value for each user whose check fails
+            max_workers: Maximum number of concurrent API requests
+            chunk_size: Users evaluated per task on the worker pool
+
+        Returns:
+            Iterator of (user_id, enabled) pairs in input order, produced as
+            results arrive
+
+        Example:
+            >>> for user_id, on in client.enabled_many("new-email", user_ids):
+            >>>     if on:
+            >>>         send_new_email(user_id)
+        """
+        return self._evaluate_many(
+            functools.partial(self._enabled, flag_name, default=default, use_pool=False),
+            flag_name, user_ids, max_workers, chunk_size
+        )
+
+    def variant_many(
+        self,
+        flag_name: str,
+        user_ids: Iterable[str],
+        default: str = "control",
+        max_workers: int = 8,
+        chunk_size: int = 100
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Get experiment variants for many users.
+
+        Args:
+            flag_name: Name of the experiment flag
+            user_ids: User identifiers; may be a generator
+            default: Variant for each user whose evaluation fails
+            max_workers: Maximum number of concurrent API requests
+            chunk_size: Users evaluated per task on the worker pool
+
+        Returns:
+            Iterator of (user_id, variant) pairs in input order, produced as
+            results arrive
+        """
+        return self._evaluate_many(
+            functools.partial(self._variant, flag_name, default=default, use_pool=False),
+            flag_name, user_ids, max_workers, chunk_size
+        )
+
+    def _evaluate_many(
+        self,
+        evaluate: Callable[[str], T],
+        flag_name: str,
+        user_ids: Iterable[str],
+        max_workers: int,
+        chunk_size: int
+    ) -> Iterator[Tuple[str, T]]:
+        """
+        Flags answered by the snapshot are evaluated inline, which is faster
+        than any thread pool. Otherwise users are split into chunks evaluated
+        on a bounded pool, with at most 2 * max_workers chunks in flight so
+        memory stays flat for arbitrarily long inputs.
+
+        The bulk pool already bounds concurrency, so its workers send requests
+        directly, with the deadline as the request timeout, rather than going
+        through the shared deadline worker pool.
+        """
+        if self.snapshot is not None and (self.serverless or flag_name in self.snapshot):
+            for user_id in user_ids:
+                yield user_id, evaluate(user_id)
+            return
+
+        def run(chunk: List[str]) -> List[Tuple[str, T]]:
+            return [(user_id, evaluate(user_id)) for user_id in chunk]
+
+        chunks = _chunked(user_ids, chunk_size)
+        in_flight: Deque[Any] = deque()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="setbit-many") as pool:
+            for chunk in chunks:
+                in_flight.append(pool.submit(run, chunk))
+                if len(in_flight) >= 2 * max_workers:
+                    yield from in_flight.popleft().result()
+
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+    def _evaluate(
+        self,
+        flag_name: str,
+        user_id: str,
+        deadline: Optional[float] = None,
+        trace: BaseTrace = NULL_TRACE,
+        use_pool: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate a flag from the local snapshot, or via the API if the
+        snapshot doesn't contain it (never in serverless mode).
+
+        With use_pool=False the request runs in the calling thread with the
+        deadline as its timeout, unhedged; for callers that bound their own
+        concurrency.
+
+        Returns:
+            Evaluation result, or None if the caller should return its default
+
+        Raises:
+            SetBitAPIError: If the API request fails or the deadline expires
+        """
+        if self.snapshot is not None:
+            with trace.phase("snapshot"):
+                result = self.snapshot.evaluate(flag_name, user_id)
+            if result is not None:
+                trace.source = SOURCE_SNAPSHOT
+                return result
+
+            if self.serverless:
+                logger.debug(f"Flag '{flag_name}' not in snapshot, returning default")
+                return None
+
+        if deadline is None:
+            deadline = self.deadline
+
+        if deadline is not None and deadline <= 0:
+            raise SetBitAPIError("Deadline of 0 ms exceeded")
+
+        if not use_pool:
+            timeout = self.timeout if deadline is None else min(self.timeout, deadline)
+            return self._fetch_evaluation(flag_name, user_id, timeout, trace)
+
+        if deadline is None and not self.hedge:
+            return self._fetch_evaluation(flag_name, user_id, self.timeout, trace)
+
+        return self._fetch_within(flag_name, user_id, deadline, trace)
+
+    def _fetch_within(
+        self,
+        flag_name: str,
+        user_id: str,
+        deadline: Optional[float],
+        trace: BaseTrace = NULL_TRACE
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch an evaluation on the worker pool so the total wait, connection
+        setup included, is bounded by the deadline. With hedging enabled, a
+        second request races the first once it is slower than the recent p95.
+
+        A call with a deadline waits for a free worker within the deadline.
+        A hedged call without one runs in the caller's thread, unhedged, when
+        every worker is busy.
+
+        Raises:
+            SetBitAPIError: If every request failed or the deadline expires
+        """
+        budget = self.timeout if deadline is None else deadline
+        timeout = min(self.timeout, budget)
+        started = time.monotonic()
+
+        def attempt() -> Tuple[Optional[Dict[str, Any]], BaseTrace]:
+            # Each request times itself, since the caller may stop waiting for
+            # it; only the winner's timings are merged into the trace
+            timings = trace.attempt()
+            # When hedging, failed responses raise so they can't win the race
+            result = self._fetch_evaluation(flag_name, user_id, timeout, timings, self.hedge)
+            return result, timings
+
+        first = self._submit(attempt, wait=0.0 if deadline is None else budget)
+        if first is None:
+            if deadline is None:
+                return self._fetch_evaluation(flag_name, user_id, timeout, trace)
+            raise SetBitAPIError(
+                f"Deadline of {budget * 1000:.0f} ms exceeded waiting for a worker"
+            )
+        futures = [first]
+
+        hedge_after = self._latencies.percentile(95) if self.hedge else None
+        if hedge_after is not None and hedge_after < budget:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                logger.debug(
+                    f"Hedging evaluation of '{flag_name}' after {hedge_after * 1000:.0f} ms"
+                )
+                second = self._submit(attempt)
+                if second is not None:
+                    futures.append(second)
+
+        remaining = budget - (time.monotonic() - started)
+        result, timings = first_result(futures, max(0.0, remaining))
+        trace.merge(timings)
+        return result
+
+    def _fetch_evaluation(
+        self,
+        flag_name: str,
+        user_id: str,
+        timeout: float,
+        trace: BaseTrace = NULL_TRACE,
+        raise_errors: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Evaluation result, or None on an error response unless raise_errors is set
+
+        Raises:
+            SetBitAPIError: If the request fails, or on an error response with raise_errors
+        """
+        url = f"{self.base_url}/v1/evaluate"
+
+        payload = {
+            "apiKey": self.api_key,
+            "userId": user_id,
+            "tags": self.tags,
+            "flagName": flag_name
+        }
+
+        with trace.phase("serialize"):
+            body = json.dumps(payload).encode("utf-8")
+
+        started = time.monotonic()
+        with trace.phase("network"):
+            response = self.transport.post(
+                url, data=body, headers=JSON_HEADERS, timeout=timeout
+            )
+        self._latencies.record(time.monotonic() - started)
+        trace.server_timing(response.headers)
+
+        # Handle authentication errors
+        if response.status_code == 401:
+            logger.error(f"Invalid API key")
+        # Handle other errors - fail open
+        elif not response.ok:
+            logger.error(f"API error {response.status_code} evaluating flag '{flag_name}'")
+
+        if not response.ok:
+            if raise_errors:
+                response.raise_for_status()
+            return None
+
+        with trace.phase("decode"):
+            result: Dict[str, Any] = response.json()
+
+        trace.source = SOURCE_NETWORK
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="setbit"
+                    )
+        return self._executor
+
+    def _submit(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        wait: float = 0.0
+    ) -> "Optional[Future[T]]":
+        """
+        Run func on a free worker, waiting up to `wait` seconds for one.
+
+        Returns:
+            The future, or None if no worker became free. Tasks never queue
+            behind stale requests in the executor, so a deadline always starts
+            counting on a running request.
+        """
+        acquired = (
+            self._workers.acquire(timeout=wait) if wait > 0
+            else self._workers.acquire(blocking=False)
+        )
+        if not acquired:
+            return None
+
+        def run() -> T:
+            try:
+                return func(*args)
+            finally:
+                self._workers.release()
+
+        try:
+            return self._get_executor().submit(run)
+        except BaseException:
+            self._workers.release()
+            raise
 
     def track(
         self,
@@ -157,37 +759,332 @@ class SetBit:
             metadata: Optional metadata dictionary
 
         Note:
-            Fails silently if tracking request fails (logs error but doesn't raise)
+            Fails silently if tracking request fails (logs error but doesn't raise).
+            With batch_size set or in serverless mode, the event is queued and sent by flush().
+            With a sample rate for event_name, the event may be dropped.
 
         Example:
             >>> variant = client.variant("pricing-test", user_id)
             >>> # ... later when user converts ...
             >>> client.track("purchase", user_id, flag_name="pricing-test", variant=variant)
         """
-        try:
-            url = f"{self.base_url}/v1/track"
+        trace = self._tracer.start("track", flag_name, user_id, event_name)
+
+        rate = self.sample_rates.get(event_name, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            trace.finish("sampled_out")
+            return
+
+        event: Dict[str, Any] = {
+            "userId": user_id,
+            "eventName": event_name
+        }
+
+        if flag_name:
+            event["flagName"] = flag_name
+
+        if variant:
+            event["variant"] = variant
+
+        if metadata:
+            event["metadata"] = metadata
+
+        if rate < 1.0:
+            event["weight"] = 1.0 / rate
+
+        if self.batch_size <= 0 and not self.serverless:
+            sent = self._send_event(event, trace, retry=False)
+            trace.finish("sent" if sent else "failed", SOURCE_NETWORK)
+
+            # Exposures queued by variant() go out with the next tracked event
+            if self.queued_events:
+                self._flush(retry=False)
+            return
+
+        if self._enqueue(event):
+            self._flush(retry=False)
+
+        trace.finish("queued", SOURCE_QUEUE)
+
+    def add_hook(self, hook: HookLike) -> None:
+        """
+        Register a tracing hook.
+
+        Args:
+            hook: Hook instance, or a callable receiving each finished EvaluationRecord
+
+        Example:
+            >>> client.add_hook(lambda record: print(record.flag_name, record.phases))
+        """
+        self._tracer.add_hook(hook)
+
+    def remove_hook(self, hook: HookLike) -> None:
+        """
+        Unregister a tracing hook added with add_hook() or the hooks argument.
+
+        Args:
+            hook: The same Hook instance or callable that was registered
+        """
+        self._tracer.remove_hook(hook)
+
+    @property
+    def queued_events(self) -> int:
+        """Number of tracked events waiting to be uploaded"""
+        with self._queue_lock:
+            return len(self._event_queue)
+
+    def _record_exposure(self, flag_name: str, user_id: str, variant: str) -> None:
+        """
+        Queue an exposure event. variant() never sends anything itself: queued
+        exposures go out with the next tracked event, flush() or close(), and
+        a full batch is flushed on a background thread.
+        """
+        if not self._exposures.should_record(user_id, flag_name, variant):
+            return
+
+        rate = self.sample_rates.get(EXPOSURE_EVENT, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return
+
+        event: Dict[str, Any] = {
+            "userId": user_id,
+            "eventName": EXPOSURE_EVENT,
+            "flagName": flag_name,
+            "variant": variant
+        }
+        if rate < 1.0:
+            event["weight"] = 1.0 / rate
+
+        if self._enqueue(event):
+            self._flush_in_background()
+
+    def _enqueue(self, event: Dict[str, Any]) -> bool:
+        """
+        Append an event to the queue, dropping the oldest one if the queue
+        holds max_queue_size events.
+
+        Returns:
+            True if a full batch is queued
+        """
+        with self._queue_lock:
+            if len(self._event_queue) >= self.max_queue_size:
+                del self._event_queue[0]
+                self.dropped_events += 1
+            self._event_queue.append(event)
+            return 0 < self.batch_size <= len(self._event_queue)
+
+    def _flush_in_background(self) -> None:
+        # One background flush at a time; it sends everything queued so far
+        with self._queue_lock:
+            if self._flushing_in_background:
+                return
+            self._flushing_in_background = True
+
+        def run() -> None:
+            full = True
+            try:
+                # Batches that filled up during an upload are sent by this thread too
+                while full:
+                    self.flush()
+                    with self._queue_lock:
+                        full = 0 < self.batch_size <= len(self._event_queue)
+                        self._flushing_in_background = full
+            finally:
+                if full:
+                    with self._queue_lock:
+                        self._flushing_in_background = False
+
+        threading.Thread(target=run, name="setbit-flush", daemon=True).start()
 
-            payload = {
-                "apiKey": self.api_key,
-                "userId": user_id,
-                "eventName": event_name
+    def flush(self) -> None:
+        """
+        Upload all queued events.
+
+        Uses the configured batch format. If the server rejects a compact
+        format (HTTP 415), the client falls back to the per-event JSON shape
+        for this and all later uploads.
+
+        Note:
+            Fails silently like track(); events from a failed upload are
+            retried up to max_retries times, then dropped
+        """
+        self._flush(retry=True)
+
+    def _flush(self, retry: bool) -> None:
+        """
+        Upload all queued events, retrying failed uploads only if retry is set.
+        Flushes running inside track() pass retry=False so they never sleep
+        in the caller's thread.
+        """
+        with self._queue_lock:
+            events, self._event_queue = self._event_queue, []
+
+        if not events:
+            return
+
+        if self.batch_format != FORMAT_JSON:
+            try:
+                if self._send_batch(events, retry):
+                    return
+            except SetBitAPIError as e:
+                logger.error(f"Failed to upload batch of {len(events)} events: {e}")
+                return
+            except Exception as e:
+                logger.error(f"Unexpected error uploading batch of {len(events)} events: {e}")
+                return
+
+        for event in events:
+            self._send_event(event, retry=retry)
+
+    def _send_batch(self, events: List[Dict[str, Any]], retry: bool = True) -> bool:
+        """
+        Upload events in the compact batch format.
+
+        Returns:
+            False if the server does not accept the format and the caller
+            should resend the events one by one
+        """
+        url = f"{self.base_url}/v1/track"
+        batch_format = self.batch_format
+
+        def send() -> Response:
+            # Re-encoded on every attempt since a streamed body can only be read once
+            chunks = encode_batch(events, {"apiKey": self.api_key}, batch_format)
+            content_encoding, body = compress_stream(
+                chunks, self.compress_threshold, self.compression
+            )
+
+            headers = {
+                "Content-Type": NDJSON_CONTENT_TYPE,
+                BATCH_FORMAT_HEADER: batch_format
             }
+            if content_encoding:
+                headers["Content-Encoding"] = content_encoding
+
+            return self.transport.post(url, data=body, headers=headers, timeout=self.timeout)
 
-            if flag_name:
-                payload["flagName"] = flag_name
+        response = self._with_retries(send) if retry else send()
 
-            if variant:
-                payload["variant"] = variant
+        if response.status_code == 415:
+            logger.info(
+                f"Server does not accept '{self.batch_format}' batches, "
+                f"falling back to per-event JSON"
+            )
+            self.batch_format = FORMAT_JSON
+            return False
 
-            if metadata:
-                payload["metadata"] = metadata
+        response.raise_for_status()
 
-            response = requests.post(url, json=payload, timeout=5)
+        logger.debug(f"Tracked batch of {len(events)} events")
+        return True
+
+    def handler(self, func: F) -> F:
+        """
+        Decorate a serverless handler so queued events are flushed before it returns.
+
+        Example:
+            >>> client = SetBit(api_key="pk_abc123", snapshot="flags.json", serverless=True)
+            >>> @client.handler
+            >>> def lambda_handler(event, context):
+            >>>     ...
+        """
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.flush()
+
+        return wrapper  # type: ignore
+
+    def _with_retries(self, send: Callable[[], Response]) -> Response:
+        """
+        Call send(), retrying network errors and retryable statuses with
+        jittered exponential backoff while max_retries and retry_budget allow.
+        """
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            error: Optional[SetBitAPIError] = None
+            try:
+                response = send()
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+            except SetBitAPIError as e:
+                error = e
+
+            delay = backoff_delay(attempt)
+            out_of_budget = time.monotonic() - started + delay > self.retry_budget
+            if attempt >= self.max_retries or out_of_budget:
+                if error is not None:
+                    raise error
+                return response
+
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        """
+        Stop background refreshes, flush queued events and release pooled
+        connections.
+        """
+        self._closed.set()
+        self.flush()
+        self.transport.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _send_event(
+        self,
+        event: Dict[str, Any],
+        trace: BaseTrace = NULL_TRACE,
+        retry: bool = True
+    ) -> bool:
+        """
+        Send one event in the per-event JSON shape.
+
+        Args:
+            retry: Retry failed uploads (see _with_retries()); off for events
+                   sent from the caller's thread by track()
+
+        Returns:
+            True if the server accepted the event
+        """
+        event_name = event["eventName"]
+        try:
+            url = f"{self.base_url}/v1/track"
+
+            with trace.phase("serialize"):
+                body = json.dumps({"apiKey": self.api_key, **event}).encode("utf-8")
+
+            # Only the requests are timed, not the backoff between retries
+            def send() -> Response:
+                with trace.phase("network"):
+                    return self.transport.post(
+                        url, data=body, headers=JSON_HEADERS, timeout=self.timeout
+                    )
+
+            response = self._with_retries(send) if retry else send()
+            trace.server_timing(response.headers)
             response.raise_for_status()
 
-            logger.debug(f"Tracked event '{event_name}' for user '{user_id}'")
+            logger.debug(f"Tracked event '{event_name}' for user '{event['userId']}'")
+            return True
 
-        except requests.RequestException as e:
+        except SetBitAPIError as e:
             logger.error(f"Failed to track event '{event_name}': {e}")
         except Exception as e:
             logger.error(f"Unexpected error tracking event '{event_name}': {e}")
+        return False
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
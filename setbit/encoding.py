@@ -0,0 +1,108 @@
+"""
+Batch wire formats for event uploads
+"""
+import itertools
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+FORMAT_COLUMNAR = "columnar"
+BATCH_FORMATS = (FORMAT_JSON, FORMAT_NDJSON, FORMAT_COLUMNAR)
+
+COMPRESSIONS = ("gzip", "deflate")
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+BATCH_FORMAT_HEADER = "X-SetBit-Batch-Format"
+
+# Column order for the columnar layout; the header line announces it to the server
+EVENT_COLUMNS = ("userId", "eventName", "flagName", "variant", "metadata", "weight")
+
+# zlib window bits: 16 + MAX_WBITS emits a gzip container, MAX_WBITS a zlib one
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def _dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def encode_batch(
+    events: Iterable[Dict[str, Any]],
+    header: Dict[str, Any],
+    batch_format: str
+) -> Iterator[bytes]:
+    """
+    Encode a batch of events as newline-delimited JSON, one line at a time.
+
+    The first line is a header carrying fields shared by every event (such as
+    the API key), so they are sent once per batch instead of once per event.
+
+    Args:
+        events: Event dictionaries without the shared fields
+        header: Fields shared by all events in the batch
+        batch_format: FORMAT_NDJSON (one object per event) or FORMAT_COLUMNAR
+                      (one array per event, ordered as EVENT_COLUMNS)
+
+    Returns:
+        Iterator of encoded lines
+
+    Raises:
+        ValueError: If batch_format is not a streaming format
+    """
+    if batch_format == FORMAT_NDJSON:
+        yield _dumps(header)
+        for event in events:
+            yield _dumps(event)
+    elif batch_format == FORMAT_COLUMNAR:
+        yield _dumps(dict(header, columns=list(EVENT_COLUMNS)))
+        for event in events:
+            yield _dumps([event.get(column) for column in EVENT_COLUMNS])
+    else:
+        raise ValueError(f"Unsupported batch format: {batch_format}")
+
+
+def _compress(chunks: Iterable[bytes], compression: str) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=_WBITS[compression])
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_stream(
+    chunks: Iterable[bytes],
+    threshold: int,
+    compression: Optional[str] = "gzip"
+) -> Tuple[Optional[str], Union[bytes, Iterator[bytes]]]:
+    """
+    Compress an encoded stream once it grows past a size threshold.
+
+    Only the first `threshold` bytes are buffered to make the decision, so a
+    large batch is compressed incrementally and never held in memory whole.
+
+    Args:
+        chunks: Encoded chunks, e.g. from encode_batch()
+        threshold: Payloads of at most this many bytes are sent uncompressed
+        compression: "gzip", "deflate" or None to disable compression
+
+    Returns:
+        Tuple of (Content-Encoding or None, body). The body is plain bytes for
+        small payloads and an iterator of chunks otherwise.
+    """
+    iterator = iter(chunks)
+    if compression is None:
+        return None, iterator
+
+    head = []
+    size = 0
+    for chunk in iterator:
+        head.append(chunk)
+        size += len(chunk)
+        if size > threshold:
+            break
+    else:
+        return None, b"".join(head)
+
+    return compression, _compress(itertools.chain(head, iterator), compression)
@@ -0,0 +1,76 @@
+"""
+Exposure de-duplication for experiment impressions
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+EXPOSURE_EVENT = "$exposure"
+
+
+class ExposureCache:
+    """
+    Bounded LRU of recently recorded (user, flag, variant) impressions.
+
+    An impression is recorded at most once per `window` seconds. When the
+    cache is full the least recently seen impression is evicted, so memory
+    stays bounded no matter how many users call variant().
+
+    Example:
+        >>> cache = ExposureCache(max_size=10000, window=3600)
+        >>> cache.should_record("user_123", "pricing-test", "variant_a")
+        True
+        >>> cache.should_record("user_123", "pricing-test", "variant_a")
+        False
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        window: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize exposure cache.
+
+        Args:
+            max_size: Maximum number of impressions remembered
+            window: Seconds during which a repeated impression is suppressed
+            clock: Time source (monotonic seconds)
+        """
+        self.max_size = max_size
+        self.window = window
+        self._clock = clock
+        self._seen: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def should_record(self, user_id: str, flag_name: str, variant: str) -> bool:
+        """
+        Check whether an impression is new and remember it.
+
+        Args:
+            user_id: User identifier
+            flag_name: Name of the experiment flag
+            variant: Variant the user was assigned to
+
+        Returns:
+            True if the impression was not seen within the window
+        """
+        key = (user_id, flag_name, variant)
+        now = self._clock()
+
+        with self._lock:
+            recorded_at = self._seen.get(key)
+            if recorded_at is not None and now - recorded_at < self.window:
+                self._seen.move_to_end(key)
+                return False
+
+            self._seen[key] = now
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
@@ -0,0 +1,106 @@
+"""
+Latency tracking, deadlines and retry backoff
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Deque, List, Optional, TypeVar
+
+from .exceptions import SetBitAPIError
+
+T = TypeVar("T")
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent request latencies.
+
+    Used to pick the hedging delay: a second request is only sent once the
+    first has taken longer than most recent requests did.
+    """
+
+    def __init__(self, size: int = 1000, min_samples: int = 20):
+        """
+        Args:
+            size: Number of most recent samples kept
+            min_samples: Samples required before percentile() returns a value
+        """
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds, or None until enough samples are recorded
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+def backoff_delay(attempt: int, base: float = 0.1, cap: float = 5.0) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay ceiling for the first retry, in seconds
+        cap: Maximum delay ceiling, in seconds
+
+    Returns:
+        Random delay between 0 and min(cap, base * 2 ** attempt)
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def first_result(futures: List["Future[T]"], timeout: float) -> T:
+    """
+    Wait for the first future to succeed within a timeout.
+
+    Futures that fail are skipped as long as another one is still pending.
+
+    Args:
+        futures: Futures racing for the same result
+        timeout: Seconds to wait in total
+
+    Returns:
+        Result of the first successful future
+
+    Raises:
+        SetBitAPIError: If the timeout expires first
+        Exception: The last error if every future failed
+    """
+    expires_at = time.monotonic() + timeout
+    pending = set(futures)
+    error: Optional[BaseException] = None
+
+    while pending:
+        remaining = max(0.0, expires_at - time.monotonic())
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        if not done:
+            raise SetBitAPIError(f"Deadline of {timeout * 1000:.0f} ms exceeded")
+
+        for future in done:
+            error = future.exception()
+            if error is None:
+                return future.result()
+
+    assert error is not None
+    raise error
@@ -0,0 +1,388 @@
+"""
+Record and replay flag evaluation traffic for load testing
+
+Record production traffic with a tracing hook:
+
+    >>> recorder = TrafficRecorder("traffic.ndjson")
+    >>> client = SetBit(api_key="pk_abc123", hooks=[recorder])
+
+Replay it against a local stub server:
+
+    $ python -m setbit.loadtest traffic.ndjson --speed 2 --threads 8
+"""
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import IO, Any, Dict, List, Optional, Sequence, Union
+
+from .client import SetBit
+from .exposure import EXPOSURE_EVENT
+from .snapshot import Snapshot
+from .tracing import SOURCE_DEFAULT, EvaluationRecord, Hook
+
+
+def hash_user_id(user_id: str, salt: str = "") -> str:
+    """
+    Pseudonymize a user ID for recording. The same ID always maps to the
+    same hash, so per-user behavior (assignments, de-duplication) replays
+    faithfully.
+    """
+    return hashlib.sha256(f"{salt}{user_id}".encode("utf-8")).hexdigest()[:16]
+
+
+class TrafficRecorder(Hook):
+    """
+    Tracing hook that writes every call to an NDJSON file.
+
+    Each line holds the call's start time, method, flag, hashed user ID,
+    event name, outcome, source and duration.
+    """
+
+    def __init__(self, output: Union[str, IO[str]], salt: str = ""):
+        """
+        Args:
+            output: Path or text file object to append records to
+            salt: Salt mixed into user ID hashes
+        """
+        self._owns_file = isinstance(output, str)
+        if isinstance(output, str):
+            self._file: IO[str] = open(output, "a", encoding="utf-8")
+        else:
+            self._file = output
+        self.salt = salt
+        self._lock = threading.Lock()
+
+    def after(self, record: EvaluationRecord) -> None:
+        line = json.dumps({
+            "ts": record.started_at,
+            "method": record.method,
+            "flag": record.flag_name,
+            "user": hash_user_id(record.user_id or "", self.salt),
+            "event": record.event_name,
+            "value": record.value,
+            "source": record.source,
+            "duration": record.duration,
+        })
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.flush()
+            if self._owns_file:
+                self._file.close()
+
+
+def load_traffic(path: str) -> List[Dict[str, Any]]:
+    """Read recorded calls from an NDJSON file, in start-time order"""
+    with open(path, "r", encoding="utf-8") as fh:
+        calls = [json.loads(line) for line in fh if line.strip()]
+    return sorted(calls, key=lambda call: call["ts"])
+
+
+class StubServer:
+    """
+    Local stand-in for the SetBit API, served from a background thread.
+
+    /v1/evaluate and /v1/flags answer from the given flag definitions and
+    /v1/track accepts per-event and batched uploads, counting events.
+
+    Example:
+        >>> with StubServer(flags) as server:
+        >>>     client = SetBit(api_key="loadtest", base_url=server.url)
+    """
+
+    def __init__(
+        self,
+        flags: Optional[Dict[str, Dict[str, Any]]] = None,
+        latency: float = 0.0,
+        port: int = 0
+    ):
+        """
+        Args:
+            flags: Flag definitions in snapshot format; unknown flags evaluate
+                   as disabled
+            latency: Seconds of simulated server time added to every response
+            port: Port to listen on (0 picks a free port)
+        """
+        self.flags = flags or {}
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self.events_received = 0
+        self._snapshot = Snapshot(self.flags)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{str(host)}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="setbit-stub-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _respond(self, path: str, body: bytes, headers: Any) -> Any:
+        with self._lock:
+            self.requests[path] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if path == "/v1/flags":
+            return self.flags
+
+        if path == "/v1/evaluate":
+            payload = json.loads(body)
+            result = self._snapshot.evaluate(payload["flagName"], payload["userId"])
+            return result if result is not None else {"enabled": False}
+
+        if path == "/v1/track":
+            if headers.get("Content-Encoding") in ("gzip", "deflate"):
+                # wbits=47 auto-detects gzip and zlib containers
+                body = zlib.decompress(body, 47)
+            # Batches have one header line plus one line per event
+            is_batch = headers.get("Content-Type", "").startswith("application/x-ndjson")
+            count = body.count(b"\n") - 1 if is_batch else 1
+            with self._lock:
+                self.events_received += count
+            return {}
+
+        return None
+
+    def _handler_class(self) -> Any:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                body = self._read_body()
+                result = stub._respond(self.path, body, self.headers)
+                if result is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                data = json.dumps(result).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _read_body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    chunks: List[bytes] = []
+                    while True:
+                        size = int(self.rfile.readline().strip(), 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return b"".join(chunks)
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def _percentile(ordered: Sequence[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ReplayReport:
+    """Throughput, latency and source breakdown of a replay run"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self.latencies: Dict[str, List[float]] = {}
+        self.sources: Counter = Counter()
+        self.max_queue_depth = 0
+
+    @property
+    def throughput(self) -> float:
+        """Calls per second"""
+        return self.calls / self.elapsed if self.elapsed else 0.0
+
+    def percentiles(self, method: str) -> Dict[str, float]:
+        """p50/p95/p99 latency in seconds for one method"""
+        ordered = sorted(self.latencies.get(method, []))
+        return {f"p{pct}": _percentile(ordered, pct) for pct in (50, 95, 99)}
+
+    def summary(self) -> str:
+        lines = [
+            f"calls: {self.calls}  errors: {self.errors}  elapsed: {self.elapsed:.2f}s  "
+            f"throughput: {self.throughput:.1f}/s",
+        ]
+        for method in sorted(self.latencies):
+            p = self.percentiles(method)
+            lines.append(
+                f"{method:<8} n={len(self.latencies[method]):<8} "
+                f"p50={p['p50'] * 1000:.2f}ms  p95={p['p95'] * 1000:.2f}ms  "
+                f"p99={p['p99'] * 1000:.2f}ms"
+            )
+        sources = ", ".join(f"{source}={count}" for source, count in sorted(self.sources.items()))
+        lines.append(f"sources: {sources or '-'}")
+        lines.append(f"max queued events: {self.max_queue_depth}")
+        return "\n".join(lines)
+
+
+class _SourceCounter(Hook):
+    """
+    Counts sources and errors. Calls fail open instead of raising, so
+    errors are read from the record: a flag check that fell back to its
+    default, or an event that could not be sent.
+    """
+
+    def __init__(self, report: ReplayReport, lock: threading.Lock):
+        self.report = report
+        self.lock = lock
+
+    def after(self, record: EvaluationRecord) -> None:
+        failed = (
+            record.error is not None
+            or record.source == SOURCE_DEFAULT
+            or (record.method == "track" and record.value == "failed")
+        )
+        with self.lock:
+            self.report.sources[record.source or "unknown"] += 1
+            self.report.errors += int(failed)
+
+
+def replay(
+    calls: Sequence[Dict[str, Any]],
+    client: SetBit,
+    speed: float = 1.0,
+    threads: int = 4
+) -> ReplayReport:
+    """
+    Drive recorded calls against a client.
+
+    Args:
+        calls: Recorded calls, e.g. from load_traffic()
+        client: Client under test
+        speed: Replay rate relative to the recording (2.0 is twice as fast);
+               0 replays as fast as possible
+        threads: Number of threads issuing calls
+
+    Returns:
+        ReplayReport
+    """
+    report = ReplayReport()
+    lock = threading.Lock()
+    counter = _SourceCounter(report, lock)
+    calls = [call for call in calls if call.get("event") != EXPOSURE_EVENT]
+
+    def issue(call: Dict[str, Any]) -> None:
+        method = call["method"]
+        started = time.perf_counter()
+        try:
+            if method == "enabled":
+                client.enabled(call["flag"], call["user"])
+            elif method == "variant":
+                client.variant(call["flag"], call["user"])
+            elif method == "track":
+                client.track(call["event"], call["user"], flag_name=call.get("flag"))
+            else:
+                raise ValueError(f"Unknown method: {method}")
+            error = False
+        except Exception:
+            error = True
+        latency = time.perf_counter() - started
+
+        with lock:
+            report.calls += 1
+            report.errors += int(error)
+            report.latencies.setdefault(method, []).append(latency)
+            report.max_queue_depth = max(report.max_queue_depth, client.queued_events)
+
+    origin = calls[0]["ts"] if calls else 0.0
+    started = time.perf_counter()
+
+    client.add_hook(counter)
+    try:
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="setbit-replay") as pool:
+            for call in calls:
+                if speed > 0:
+                    delay = (call["ts"] - origin) / speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                pool.submit(issue, call)
+
+        client.flush()
+    finally:
+        client.remove_hook(counter)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m setbit.loadtest",
+        description="Replay recorded SetBit traffic against a local stub server",
+    )
+    parser.add_argument("traffic", help="NDJSON file written by TrafficRecorder")
+    parser.add_argument("--flags", help="JSON flag definitions served by the stub server")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay rate relative to the recording; 0 is as fast as possible")
+    parser.add_argument("--threads", type=int, default=4, help="threads issuing calls")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated server time per request, in seconds")
+    parser.add_argument("--batch-size", type=int, default=0, help="client batch_size")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="load the snapshot before replaying so checks run locally")
+    args = parser.parse_args(argv)
+
+    flags = Snapshot.load(args.flags).flags if args.flags else {}
+    calls = load_traffic(args.traffic)
+
+    with StubServer(flags, latency=args.latency) as server:
+        client = SetBit(api_key="loadtest", base_url=server.url, batch_size=args.batch_size)
+        if args.warm_up:
+            client.warm_up(connections=args.threads)
+
+        report = replay(calls, client, speed=args.speed, threads=args.threads)
+        client.close()
+
+    print(report.summary())
+    print(f"stub server: {dict(server.requests)}, events received: {server.events_received}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
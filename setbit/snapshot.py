@@ -0,0 +1,126 @@
+"""
+Local flag evaluation from a snapshot of flag definitions
+"""
+import json
+import os
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .exceptions import SetBitError
+from .utils import compute_rollout_percentage, hash_bucket
+
+SnapshotSource = Union[str, "os.PathLike[str]", Dict[str, Dict[str, Any]]]
+
+
+class Snapshot:
+    """
+    Flag definitions evaluated in-process, without calling the API.
+
+    A snapshot maps flag names to definitions:
+
+        {
+            "new-checkout": {"enabled": True, "type": "boolean"},
+            "new-api": {"enabled": True, "type": "rollout", "percentage": 25},
+            "pricing-test": {
+                "enabled": True,
+                "type": "experiment",
+                "variants": {"control": {"weight": 50}, "variant_a": {"weight": 50}}
+            }
+        }
+
+    Evaluation results have the same shape as `/v1/evaluate` responses.
+    Experiment weights are compiled into cumulative lookup tables when the
+    snapshot is created, so each assignment is a hash and a binary search.
+    """
+
+    def __init__(self, flags: Dict[str, Dict[str, Any]]):
+        self.flags = flags
+        self._tables: Dict[str, Tuple[List[int], List[str]]] = {}
+
+        for flag_name, flag in flags.items():
+            if flag.get("type") == "experiment":
+                self._tables[flag_name] = _compile_variants(flag.get("variants", {}))
+
+    @classmethod
+    def load(cls, source: SnapshotSource) -> "Snapshot":
+        """
+        Load a snapshot from a dictionary or a JSON file.
+
+        Args:
+            source: Flag definitions, or the path to a JSON file containing them
+
+        Returns:
+            Snapshot
+
+        Raises:
+            SetBitError: If the file can't be read or parsed
+        """
+        if isinstance(source, dict):
+            return cls(source)
+
+        try:
+            with open(source, "r", encoding="utf-8") as fh:
+                return cls(json.load(fh))
+        except (OSError, ValueError) as e:
+            raise SetBitError(f"Failed to load flag snapshot from '{source}': {e}") from e
+
+    def evaluate(self, flag_name: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate a flag for a user.
+
+        Args:
+            flag_name: Name of the flag
+            user_id: User identifier
+
+        Returns:
+            Dictionary with 'enabled' and, for experiments and rollouts,
+            'variant'; None if the flag is not in the snapshot
+        """
+        flag = self.flags.get(flag_name)
+        if flag is None:
+            return None
+
+        result: Dict[str, Any] = {"enabled": bool(flag.get("enabled", False))}
+        if not result["enabled"]:
+            return result
+
+        identifier = f"{flag_name}:{user_id}"
+        flag_type = flag.get("type", "boolean")
+
+        if flag_type == "experiment":
+            result["variant"] = self._assign(flag_name, identifier)
+        elif flag_type == "rollout":
+            in_rollout = compute_rollout_percentage(identifier) < flag.get("percentage", 0)
+            result["variant"] = "enabled" if in_rollout else "disabled"
+
+        return result
+
+    def _assign(self, flag_name: str, identifier: str) -> str:
+        # Weighted, sticky assignment: the identifier's hash bucket is looked
+        # up in the compiled cumulative weight table
+        cumulative, names = self._tables[flag_name]
+        if not names:
+            return "control"
+
+        total_weight = cumulative[-1]
+        if total_weight == 0:
+            return names[0]
+
+        return names[bisect_right(cumulative, hash_bucket(identifier, total_weight))]
+
+    def __contains__(self, flag_name: str) -> bool:
+        return flag_name in self.flags
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+
+def _compile_variants(variants: Dict[str, Any]) -> Tuple[List[int], List[str]]:
+    cumulative: List[int] = []
+    names: List[str] = []
+    total = 0
+    for name, config in variants.items():
+        total += config.get("weight", 0)
+        cumulative.append(total)
+        names.append(name)
+    return cumulative, names
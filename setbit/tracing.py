@@ -0,0 +1,336 @@
+"""
+Tracing hooks for flag evaluations and tracked events
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Where an evaluation result came from
+SOURCE_SNAPSHOT = "snapshot"
+SOURCE_NETWORK = "network"
+SOURCE_QUEUE = "queue"
+SOURCE_DEFAULT = "default"
+
+
+class EvaluationRecord:
+    """
+    Structured record of one enabled(), variant() or track() call.
+
+    Attributes:
+        method: "enabled", "variant" or "track"
+        flag_name: Flag evaluated or associated with the event
+        user_id: User identifier
+        event_name: Event name (track() only)
+        value: Outcome returned to the caller; for track(), "sent", "queued",
+               "sampled_out" or "failed"
+        source: SOURCE_SNAPSHOT, SOURCE_NETWORK, SOURCE_QUEUE or SOURCE_DEFAULT
+        phases: Seconds spent per phase ("snapshot", "serialize", "network",
+                "server", "decode"); "server" is taken from the Server-Timing
+                response header and is part of "network", as is connection
+                setup, which transports don't report separately
+        error: Error message if the call fell back to its default
+        started_at: Wall-clock start time (seconds since the epoch)
+        duration: Total seconds spent in the call
+    """
+
+    def __init__(
+        self,
+        method: str,
+        flag_name: Optional[str] = None,
+        user_id: Optional[str] = None,
+        event_name: Optional[str] = None
+    ):
+        self.method = method
+        self.flag_name = flag_name
+        self.user_id = user_id
+        self.event_name = event_name
+        self.value: Any = None
+        self.source: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.duration = 0.0
+
+    def to_attributes(self) -> Dict[str, Any]:
+        """
+        Flatten the record into span attributes following the OpenTelemetry
+        feature flag semantic conventions, for use with any tracing backend.
+        """
+        attributes: Dict[str, Any] = {
+            "feature_flag.provider_name": "setbit",
+            "setbit.method": self.method,
+            "setbit.source": self.source,
+            "setbit.duration_ms": self.duration * 1000,
+        }
+        if self.flag_name is not None:
+            attributes["feature_flag.key"] = self.flag_name
+        if self.user_id is not None:
+            attributes["feature_flag.context.id"] = self.user_id
+        if self.event_name is not None:
+            attributes["setbit.event_name"] = self.event_name
+        if self.value is not None:
+            attributes["feature_flag.variant"] = str(self.value)
+        if self.error is not None:
+            attributes["error.message"] = self.error
+        for phase, seconds in self.phases.items():
+            attributes[f"setbit.phase.{phase}_ms"] = seconds * 1000
+        return attributes
+
+
+class Hook:
+    """
+    Base class for tracing hooks. Override either method.
+
+    before() runs when a call starts and after() when it returns, with the
+    same record, so a hook can open a span in one and close it in the other.
+
+    Example:
+        >>> class OpenTelemetryHook(Hook):
+        >>>     def before(self, record):
+        >>>         record.span = tracer.start_span(f"setbit.{record.method}")
+        >>>     def after(self, record):
+        >>>         record.span.set_attributes(record.to_attributes())
+        >>>         record.span.end()
+    """
+
+    def before(self, record: EvaluationRecord) -> None:
+        pass
+
+    def after(self, record: EvaluationRecord) -> None:
+        pass
+
+
+class _CallableHook(Hook):
+    def __init__(self, func: Callable[[EvaluationRecord], None]):
+        self.func = func
+
+    def after(self, record: EvaluationRecord) -> None:
+        self.func(record)
+
+
+HookLike = Union[Hook, Callable[[EvaluationRecord], None]]
+
+
+class _NullPhase:
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class BaseTrace:
+    """
+    Trace that records nothing. Used when tracing is off or the call is not
+    sampled, so every tracing call is a no-op; base class of Trace.
+    """
+
+    @property
+    def source(self) -> Optional[str]:
+        return None
+
+    @source.setter
+    def source(self, value: str) -> None:
+        pass
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """Time a phase; repeated phases (e.g. retries) are summed"""
+        return _NULL_PHASE
+
+    def server_timing(self, headers: Dict[str, str]) -> None:
+        """Record the "server" phase from a Server-Timing response header"""
+        pass
+
+    def attempt(self) -> "BaseTrace":
+        """
+        Start timing one of several concurrent attempts at the same work
+        (e.g. hedged requests). Only timings passed to merge() are kept.
+        """
+        return self
+
+    def merge(self, attempt: "BaseTrace") -> None:
+        """Add the timings and source of the attempt whose result was used"""
+        pass
+
+    def finish(
+        self,
+        value: T,
+        source: Optional[str] = None,
+        error: Optional[BaseException] = None
+    ) -> T:
+        """
+        Complete the record and pass it to every hook.
+
+        Returns:
+            value, so callers can `return trace.finish(value)`
+        """
+        return value
+
+
+NULL_TRACE = BaseTrace()
+
+
+class _Timings(BaseTrace):
+    """Phase timings and source collected by a trace or one of its attempts"""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self._source: Optional[str] = None
+
+    @property
+    def source(self) -> Optional[str]:
+        return self._source
+
+    @source.setter
+    def source(self, value: str) -> None:
+        self._source = value
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def phase(self, name: str) -> ContextManager[None]:
+        return self._timed(name)
+
+    def server_timing(self, headers: Dict[str, str]) -> None:
+        value = next((v for k, v in headers.items() if k.lower() == "server-timing"), None)
+        if not value:
+            return
+
+        total_ms = 0.0
+        for metric in value.split(","):
+            for param in metric.split(";")[1:]:
+                key, _, number = param.strip().partition("=")
+                if key == "dur":
+                    try:
+                        total_ms += float(number)
+                    except ValueError:
+                        pass
+        self.phases["server"] = total_ms / 1000
+
+    def attempt(self) -> BaseTrace:
+        return _Timings()
+
+
+class Trace(_Timings):
+    """
+    Collects timings for one traced call and reports it to the hooks.
+
+    The record is filled in by finish(); anything recorded afterwards, e.g.
+    by a request the caller stopped waiting for, is dropped.
+    """
+
+    def __init__(self, hooks: List[Hook], record: EvaluationRecord):
+        super().__init__()
+        self.hooks = hooks
+        self.record = record
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._finished = False
+
+        for hook in hooks:
+            try:
+                hook.before(record)
+            except Exception as e:
+                logger.error(f"Tracing hook failed in before(): {e}")
+
+    def merge(self, attempt: BaseTrace) -> None:
+        if not isinstance(attempt, _Timings) or attempt is self:
+            return
+
+        with self._lock:
+            if self._finished:
+                return
+            for name, seconds in attempt.phases.items():
+                self.phases[name] = self.phases.get(name, 0.0) + seconds
+            if attempt.source is not None:
+                self._source = attempt.source
+
+    def finish(
+        self,
+        value: T,
+        source: Optional[str] = None,
+        error: Optional[BaseException] = None
+    ) -> T:
+        with self._lock:
+            if self._finished:
+                return value
+            self._finished = True
+
+            record = self.record
+            record.value = value
+            record.source = source if source is not None else self._source
+            record.phases = dict(self.phases)
+            if error is not None:
+                record.error = str(error)
+            record.duration = time.perf_counter() - self._started
+
+        for hook in self.hooks:
+            try:
+                hook.after(record)
+            except Exception as e:
+                logger.error(f"Tracing hook failed in after(): {e}")
+
+        return value
+
+
+class Tracer:
+    """Holds the registered hooks and decides which calls are traced"""
+
+    def __init__(self, hooks: Optional[List[HookLike]] = None, sample_rate: float = 1.0):
+        """
+        Args:
+            hooks: Hook instances or callables receiving the finished record
+            sample_rate: Fraction (0.0-1.0) of calls to trace
+        """
+        self.hooks: List[Hook] = []
+        self.sample_rate = sample_rate
+        for hook in hooks or []:
+            self.add_hook(hook)
+
+    # Hooks are replaced rather than mutated, so a call in progress keeps
+    # reporting to the hooks registered when it started
+
+    def add_hook(self, hook: HookLike) -> None:
+        self.hooks = self.hooks + [hook if isinstance(hook, Hook) else _CallableHook(hook)]
+
+    def remove_hook(self, hook: HookLike) -> None:
+        """Unregister a hook passed to add_hook(); unknown hooks are ignored"""
+        self.hooks = [
+            registered for registered in self.hooks
+            if registered != hook
+            and not (isinstance(registered, _CallableHook) and registered.func == hook)
+        ]
+
+    def start(
+        self,
+        method: str,
+        flag_name: Optional[str] = None,
+        user_id: Optional[str] = None,
+        event_name: Optional[str] = None
+    ) -> BaseTrace:
+        """
+        Returns:
+            A Trace, or NULL_TRACE when there are no hooks or the call is not
+            sampled; NULL_TRACE makes every tracing call a no-op
+        """
+        if not self.hooks:
+            return NULL_TRACE
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return NULL_TRACE
+        return Trace(self.hooks, EvaluationRecord(method, flag_name, user_id, event_name))
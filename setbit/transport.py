@@ -0,0 +1,289 @@
+"""
+HTTP transports used by the SetBit client
+"""
+import json as jsonlib
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from .exceptions import SetBitError, SetBitAPIError
+
+Body = Union[bytes, Iterable[bytes], None]
+
+
+class Response:
+    """Transport-independent HTTP response"""
+
+    def __init__(
+        self,
+        status_code: int,
+        content: bytes = b"",
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """
+        Raises:
+            SetBitAPIError: If the status code is not successful
+        """
+        if not self.ok:
+            raise SetBitAPIError(f"HTTP {self.status_code}")
+
+
+def json_response(payload: Any, status_code: int = 200) -> Response:
+    """Build a Response with a JSON body"""
+    return Response(
+        status_code,
+        jsonlib.dumps(payload).encode("utf-8"),
+        {"Content-Type": "application/json"}
+    )
+
+
+class Transport(ABC):
+    """
+    Base class for HTTP transports.
+
+    Subclasses implement request(). Network failures must be raised as
+    SetBitAPIError so the client can fail open regardless of the transport.
+    """
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        json: Any = None,
+        data: Body = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> Response:
+        """
+        Send an HTTP request.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            json: JSON-serializable body (mutually exclusive with data)
+            data: Raw body as bytes or an iterable of chunks (streamed)
+            headers: Extra request headers
+            timeout: Timeout in seconds
+
+        Returns:
+            Response
+
+        Raises:
+            SetBitAPIError: If the request could not be completed
+        """
+
+    def post(self, url: str, **kwargs: Any) -> Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        return self.request("GET", url, **kwargs)
+
+    def preconnect(
+        self,
+        url: str,
+        connections: int = 1,
+        timeout: Optional[float] = None
+    ) -> None:
+        """
+        Open pooled connections ahead of the first real request.
+
+        Args:
+            url: Any URL on the target host
+            connections: Number of connections to open
+            timeout: Timeout in seconds for each connection
+
+        Raises:
+            SetBitAPIError: If the host can't be reached
+        """
+        pass
+
+    def close(self) -> None:
+        """Release pooled connections"""
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    HTTP/1.1 transport backed by a pooled `requests.Session`.
+
+    Connections are kept alive and reused across calls instead of opening a
+    new connection per request. `requests` is imported on the first request
+    rather than at import time, which keeps `import setbit` cheap for
+    processes that never touch the network (e.g. serverless snapshot mode).
+    """
+
+    def __init__(self, pool_size: int = 10):
+        """
+        Args:
+            pool_size: Maximum number of connections kept per host
+        """
+        self.pool_size = pool_size
+        self._session: Any = None
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> Any:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def request(self, method, url, json=None, data=None, headers=None, timeout=None):
+        session = self._get_session()
+
+        import requests
+
+        try:
+            response = session.request(
+                method, url, json=json, data=data, headers=headers, timeout=timeout
+            )
+        except requests.RequestException as e:
+            raise SetBitAPIError(str(e)) from e
+
+        return Response(response.status_code, response.content, dict(response.headers))
+
+    def preconnect(self, url, connections=1, timeout=None):
+        # Concurrent HEAD requests so each one needs its own pooled connection
+        connections = min(connections, self.pool_size)
+        errors: List[SetBitAPIError] = []
+
+        def head() -> None:
+            try:
+                self.request("HEAD", url, timeout=timeout)
+            except SetBitAPIError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=head) for _ in range(connections - 1)]
+        for thread in threads:
+            thread.start()
+        head()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+class HTTP2Transport(Transport):
+    """
+    HTTP/2 transport backed by `httpx`.
+
+    Concurrent calls from many threads are multiplexed as streams over a
+    small number of connections. Requires the optional dependency:
+    `pip install setbit[http2]`.
+    """
+
+    def __init__(self, max_connections: int = 10):
+        """
+        Args:
+            max_connections: Maximum number of open connections
+
+        Raises:
+            SetBitError: If httpx with HTTP/2 support is not installed
+        """
+        try:
+            import httpx
+        except ImportError as e:
+            raise SetBitError("HTTP2Transport requires httpx: pip install setbit[http2]") from e
+
+        self._httpx = httpx
+        try:
+            self._client = httpx.Client(
+                http2=True, limits=httpx.Limits(max_connections=max_connections)
+            )
+        except ImportError as e:
+            raise SetBitError("HTTP2Transport requires h2: pip install setbit[http2]") from e
+
+    def request(self, method, url, json=None, data=None, headers=None, timeout=None):
+        try:
+            response = self._client.request(
+                method, url, json=json, content=data, headers=headers, timeout=timeout
+            )
+        except self._httpx.HTTPError as e:
+            raise SetBitAPIError(str(e)) from e
+
+        return Response(response.status_code, response.content, dict(response.headers))
+
+    def preconnect(self, url, connections=1, timeout=None):
+        # A single HTTP/2 connection multiplexes every request
+        self.request("HEAD", url, timeout=timeout)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class Request:
+    """Request captured by InMemoryTransport"""
+
+    def __init__(self, method: str, url: str, body: bytes, headers: Dict[str, str]):
+        self.method = method
+        self.url = url
+        self.body = body
+        self.headers = headers
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.body)
+
+
+class InMemoryTransport(Transport):
+    """
+    Transport that never touches the network, for tests and benchmarks.
+
+    Every request is recorded in `requests` and answered by `handler`.
+
+    Example:
+        >>> transport = InMemoryTransport(lambda request: json_response({"enabled": True}))
+        >>> client = SetBit(api_key="pk_abc123", transport=transport)
+        >>> client.enabled("new-feature", user_id="user_123")
+        True
+    """
+
+    def __init__(self, handler: Optional[Callable[[Request], Response]] = None):
+        """
+        Args:
+            handler: Callable building the response for a request; defaults to
+                     an empty JSON object with status 200
+        """
+        self.handler = handler or (lambda request: json_response({}))
+        self.requests: List[Request] = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, json=None, data=None, headers=None, timeout=None):
+        if json is not None:
+            body = jsonlib.dumps(json).encode("utf-8")
+        elif data is None or isinstance(data, bytes):
+            body = data or b""
+        else:
+            body = b"".join(data)
+
+        request = Request(method, url, body, dict(headers or {}))
+        with self._lock:
+            self.requests.append(request)
+
+        return self.handler(request)
@@ -53,3 +53,19 @@ def select_variant(variants: Dict[str, Any]) -> str:
 
     # Fallback to control
     return "control"
+
+
+def hash_bucket(identifier: str, buckets: int) -> int:
+    """
+    Map an identifier to a consistent bucket in range(buckets).
+
+    Args:
+        identifier: Stable identifier, e.g. "<flag_name>:<user_id>"
+        buckets: Number of buckets (must be positive)
+
+    Returns:
+        Integer between 0 and buckets - 1 (inclusive)
+    """
+    hash_bytes = hashlib.sha256(identifier.encode('utf-8')).digest()
+    return int.from_bytes(hash_bytes[:8], byteorder='big') % buckets
+
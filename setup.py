@@ -34,6 +34,9 @@ setup(
         "requests>=2.25.0",
     ],
     extras_require={
+        "http2": [
+            "httpx[http2]>=0.23.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=3.0.0",
@@ -0,0 +1,131 @@
+"""
+Tests for batch wire formats and batched event uploads
+"""
+import gzip
+import json
+import zlib
+
+from setbit import SetBit, InMemoryTransport
+from setbit.encoding import EVENT_COLUMNS, compress_stream, encode_batch
+from setbit.transport import Response
+
+
+def _events(count):
+    return [{"userId": f"user_{i}", "eventName": "purchase"} for i in range(count)]
+
+
+def _body_bytes(body):
+    return body if isinstance(body, bytes) else b"".join(body)
+
+
+def test_encode_ndjson_header_then_events():
+    """Test NDJSON batches carry shared fields once in a header line"""
+    lines = list(encode_batch(_events(2), {"apiKey": "test_key"}, "ndjson"))
+
+    assert len(lines) == 3
+    assert json.loads(lines[0]) == {"apiKey": "test_key"}
+    assert json.loads(lines[1]) == {"userId": "user_0", "eventName": "purchase"}
+    assert all(b"apiKey" not in line for line in lines[1:])
+
+
+def test_encode_columnar_rows_follow_header_columns():
+    """Test columnar batches encode each event as a row of column values"""
+    lines = list(encode_batch(_events(1), {"apiKey": "test_key"}, "columnar"))
+
+    header = json.loads(lines[0])
+    assert header["columns"] == list(EVENT_COLUMNS)
+    row = dict(zip(header["columns"], json.loads(lines[1])))
+    assert row["userId"] == "user_0"
+    assert row["flagName"] is None
+
+
+def test_encode_batch_is_lazy():
+    """Test encoding does not consume events ahead of the reader"""
+    consumed = []
+
+    def events():
+        for event in _events(100):
+            consumed.append(event)
+            yield event
+
+    stream = encode_batch(events(), {"apiKey": "test_key"}, "ndjson")
+    next(stream)
+    next(stream)
+
+    assert len(consumed) == 1
+
+
+def test_compress_stream_skips_small_payloads():
+    """Test payloads under the threshold are sent as plain bytes"""
+    encoding, body = compress_stream([b"abc\n", b"def\n"], threshold=1024)
+
+    assert encoding is None
+    assert body == b"abc\ndef\n"
+
+
+def test_compress_stream_gzip_above_threshold():
+    """Test large payloads are gzip compressed"""
+    chunks = list(encode_batch(_events(500), {"apiKey": "test_key"}, "ndjson"))
+
+    encoding, body = compress_stream(iter(chunks), threshold=1024)
+
+    assert encoding == "gzip"
+    assert gzip.decompress(_body_bytes(body)) == b"".join(chunks)
+
+
+def test_compress_stream_deflate():
+    """Test deflate compression produces a zlib stream"""
+    chunks = [b"x" * 100] * 50
+
+    encoding, body = compress_stream(chunks, threshold=10, compression="deflate")
+
+    assert encoding == "deflate"
+    assert zlib.decompress(_body_bytes(body)) == b"".join(chunks)
+
+
+def test_batched_track_uploads_when_full():
+    """Test events are queued and uploaded as one request per batch"""
+    transport = InMemoryTransport()
+    client = SetBit(api_key="test_key", batch_size=3, batch_format="ndjson", transport=transport)
+
+    client.track("purchase", "user_1")
+    client.track("purchase", "user_2")
+    assert transport.requests == []
+
+    client.track("purchase", "user_3")
+
+    assert len(transport.requests) == 1
+    request = transport.requests[0]
+    assert request.headers["Content-Type"] == "application/x-ndjson"
+    assert request.headers["X-SetBit-Batch-Format"] == "ndjson"
+    assert len(request.body.splitlines()) == 4
+
+
+def test_batched_track_falls_back_to_json_on_415():
+    """Test unsupported batch formats fall back to per-event JSON"""
+    responses = iter([Response(415), Response(200), Response(200)])
+    transport = InMemoryTransport(lambda request: next(responses))
+    client = SetBit(
+        api_key="test_key", batch_size=2, batch_format="columnar", transport=transport
+    )
+
+    client.track("purchase", "user_1")
+    client.track("purchase", "user_2")
+
+    assert len(transport.requests) == 3
+    payload = transport.requests[-1].json()
+    assert payload["apiKey"] == "test_key"
+    assert payload["userId"] == "user_2"
+    assert client.batch_format == "json"
+
+
+def test_flush_sends_partial_batch():
+    """Test flush() uploads whatever is queued"""
+    transport = InMemoryTransport()
+    client = SetBit(api_key="test_key", batch_size=100, batch_format="ndjson", transport=transport)
+
+    client.track("purchase", "user_1")
+    client.flush()
+    client.flush()
+
+    assert len(transport.requests) == 1
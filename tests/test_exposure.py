@@ -0,0 +1,158 @@
+"""
+Tests for exposure recording and event sampling
+"""
+import time
+
+import pytest
+from unittest.mock import patch
+from setbit import SetBit, SetBitError, InMemoryTransport
+from setbit.exposure import ExposureCache
+from setbit.transport import json_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _evaluate_handler(variant):
+    return lambda request: json_response({"enabled": True, "variant": variant})
+
+
+def test_exposure_cache_deduplicates_within_window():
+    """Test repeated impressions are suppressed until the window passes"""
+    clock = FakeClock()
+    cache = ExposureCache(window=60, clock=clock)
+
+    assert cache.should_record("user_1", "exp", "variant_a") is True
+    assert cache.should_record("user_1", "exp", "variant_a") is False
+    assert cache.should_record("user_1", "exp", "control") is True
+
+    clock.now = 61
+    assert cache.should_record("user_1", "exp", "variant_a") is True
+
+
+def test_exposure_cache_is_bounded():
+    """Test least recently seen impressions are evicted"""
+    cache = ExposureCache(max_size=2)
+
+    cache.should_record("user_1", "exp", "a")
+    cache.should_record("user_2", "exp", "a")
+    cache.should_record("user_1", "exp", "a")
+    cache.should_record("user_3", "exp", "a")
+
+    assert len(cache) == 2
+    assert cache.should_record("user_1", "exp", "a") is False
+    assert cache.should_record("user_2", "exp", "a") is True
+
+
+def test_variant_records_exposure_once():
+    """Test variant() queues a single exposure per user, flag and variant"""
+    transport = InMemoryTransport(_evaluate_handler("variant_a"))
+    client = SetBit(api_key="test_key", record_exposures=True, transport=transport)
+
+    for _ in range(5):
+        assert client.variant("pricing-test", "user_1") == "variant_a"
+    client.flush()
+
+    track_requests = [r for r in transport.requests if r.url.endswith("/v1/track")]
+    assert len(track_requests) == 1
+    payload = track_requests[0].json()
+    assert payload["eventName"] == "$exposure"
+    assert payload["flagName"] == "pricing-test"
+    assert payload["variant"] == "variant_a"
+
+
+def test_variant_never_uploads_exposures_inline():
+    """Test exposures stay queued instead of adding a /v1/track call to variant()"""
+    def handler(request):
+        if request.url.endswith("/v1/track"):
+            time.sleep(0.5)
+        return json_response({})
+
+    transport = InMemoryTransport(handler)
+    snapshot = {"exp": {"enabled": True, "type": "rollout", "percentage": 100}}
+    client = SetBit(
+        api_key="test_key", snapshot=snapshot, record_exposures=True, transport=transport
+    )
+
+    started = time.monotonic()
+    assert client.variant("exp", "user_1", deadline=0.02) == "enabled"
+    assert time.monotonic() - started < 0.1
+    assert transport.requests == []
+
+    client.track("purchase", "user_1")
+    events = [r.json()["eventName"] for r in transport.requests]
+    assert events == ["purchase", "$exposure"]
+
+
+def test_variant_does_not_record_exposure_by_default():
+    """Test exposures are only tracked when enabled"""
+    transport = InMemoryTransport(_evaluate_handler("variant_a"))
+    client = SetBit(api_key="test_key", transport=transport)
+
+    client.variant("pricing-test", "user_1")
+
+    assert len(transport.requests) == 1
+
+
+def test_track_sampling_drops_and_weights_events():
+    """Test sampled events are dropped or carry an inverse-rate weight"""
+    transport = InMemoryTransport()
+    client = SetBit(api_key="test_key", sample_rates={"page_view": 0.25}, transport=transport)
+
+    with patch('setbit.client.random.random') as rand:
+        rand.return_value = 0.5
+        client.track("page_view", "user_1")
+        assert transport.requests == []
+
+        rand.return_value = 0.1
+        client.track("page_view", "user_1")
+        assert transport.requests[-1].json()["weight"] == 4.0
+
+        client.track("purchase", "user_1")
+        assert "weight" not in transport.requests[-1].json()
+
+
+def test_invalid_sample_rate_raises():
+    """Test sample rates outside 0-1 are rejected"""
+    with pytest.raises(SetBitError):
+        SetBit(api_key="test_key", sample_rates={"page_view": 1.5})
+
+
+def test_full_batch_of_exposures_is_flushed_in_background():
+    """Test distinct exposures are uploaded once batch_size of them are queued"""
+    transport = InMemoryTransport(_evaluate_handler("variant_a"))
+    client = SetBit(
+        api_key="test_key", batch_size=50, batch_format="ndjson",
+        record_exposures=True, transport=transport
+    )
+
+    for i in range(5000):
+        client.variant("pricing-test", f"user_{i}")
+
+    expires_at = time.monotonic() + 1
+    while client.queued_events >= 50 and time.monotonic() < expires_at:
+        time.sleep(0.01)
+
+    assert any(r.url.endswith("/v1/track") for r in transport.requests)
+    assert client.queued_events < 50
+    assert client.dropped_events == 0
+
+
+def test_exposure_queue_is_bounded():
+    """Test the oldest exposures are dropped once max_queue_size is reached"""
+    transport = InMemoryTransport(_evaluate_handler("variant_a"))
+    client = SetBit(
+        api_key="test_key", max_queue_size=100, record_exposures=True, transport=transport
+    )
+
+    for i in range(5000):
+        client.variant("pricing-test", f"user_{i}")
+
+    assert client.queued_events == 100
+    assert client.dropped_events == 4900
+    assert not any(r.url.endswith("/v1/track") for r in transport.requests)
@@ -0,0 +1,245 @@
+"""
+Tests for deadlines, hedged evaluation and upload retries
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from setbit import SetBit, SetBitAPIError, InMemoryTransport
+from setbit.latency import LatencyTracker, backoff_delay
+from setbit.transport import Response, json_response
+
+
+def _slow_handler(seconds, variant="slow"):
+    def handler(request):
+        time.sleep(seconds)
+        return json_response({"enabled": True, "variant": variant})
+    return handler
+
+
+def test_latency_tracker_percentile():
+    """Test percentiles are only reported once enough samples exist"""
+    tracker = LatencyTracker(min_samples=10)
+    for i in range(9):
+        tracker.record(i / 100)
+    assert tracker.percentile(95) is None
+
+    tracker.record(0.5)
+    assert tracker.percentile(95) == 0.5
+    assert tracker.percentile(50) == 0.05
+
+
+def test_backoff_delay_is_capped():
+    """Test backoff grows exponentially up to the cap"""
+    assert all(0 <= backoff_delay(0, base=0.1) <= 0.1 for _ in range(50))
+    assert all(0 <= backoff_delay(10, base=0.1, cap=2.0) <= 2.0 for _ in range(50))
+
+
+def test_client_deadline_returns_default():
+    """Test enabled()/variant() give up once the deadline expires"""
+    client = SetBit(
+        api_key="test_key", deadline=0.05, transport=InMemoryTransport(_slow_handler(0.5))
+    )
+
+    started = time.monotonic()
+    assert client.enabled("new-feature", "user_1", default=True) is True
+    assert client.variant("experiment", "user_1") == "control"
+    assert time.monotonic() - started < 0.4
+
+
+def test_per_call_deadline_overrides_client():
+    """Test a per-call deadline takes precedence over the client deadline"""
+    client = SetBit(
+        api_key="test_key", deadline=0.01, transport=InMemoryTransport(_slow_handler(0.05))
+    )
+
+    assert client.variant("experiment", "user_1", deadline=1.0) == "slow"
+
+
+def test_hedged_request_wins_over_slow_first_request():
+    """Test a second request is sent after the p95 mark and the faster one is used"""
+    calls = []
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            calls.append(request)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return json_response({"enabled": True, "variant": "slow"})
+        return json_response({"enabled": True, "variant": "fast"})
+
+    client = SetBit(
+        api_key="test_key", hedge=True, deadline=1.0, transport=InMemoryTransport(handler)
+    )
+    for _ in range(20):
+        client._latencies.record(0.01)
+
+    started = time.monotonic()
+    assert client.variant("experiment", "user_1") == "fast"
+    assert time.monotonic() - started < 0.4
+    assert len(calls) == 2
+
+
+def test_flush_retries_retryable_statuses():
+    """Test queued events are retried on 5xx responses with backoff"""
+    responses = iter([Response(503), Response(502), Response(200)])
+    transport = InMemoryTransport(lambda request: next(responses))
+    client = SetBit(api_key="test_key", batch_size=10, max_retries=3, transport=transport)
+    client.track("purchase", "user_1")
+
+    with patch('setbit.client.time.sleep') as mock_sleep:
+        client.flush()
+
+    assert len(transport.requests) == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_flush_retries_stop_at_max_retries():
+    """Test queued uploads give up silently after max_retries"""
+    def handler(request):
+        raise SetBitAPIError("connection refused")
+
+    transport = InMemoryTransport(handler)
+    client = SetBit(api_key="test_key", batch_size=10, max_retries=2, transport=transport)
+    client.track("purchase", "user_1")
+
+    with patch('setbit.client.time.sleep'):
+        client.flush()
+
+    assert len(transport.requests) == 3
+
+
+def test_flush_retries_respect_budget():
+    """Test no retry is attempted once the backoff would exceed the budget"""
+    transport = InMemoryTransport(lambda request: Response(503))
+    client = SetBit(
+        api_key="test_key", batch_size=10, max_retries=5, retry_budget=0.0, transport=transport
+    )
+    client.track("purchase", "user_1")
+
+    client.flush()
+
+    assert len(transport.requests) == 1
+
+
+def test_unbatched_track_never_retries():
+    """Test track() without a queue sends once instead of sleeping in the caller"""
+    transport = InMemoryTransport(lambda request: Response(503))
+    client = SetBit(api_key="test_key", max_retries=3, transport=transport)
+
+    with patch('setbit.client.time.sleep') as mock_sleep:
+        client.track("purchase", "user_1")
+
+    assert len(transport.requests) == 1
+    mock_sleep.assert_not_called()
+
+
+def test_no_retries_by_default():
+    """Test queued uploads send a single request unless retries are configured"""
+    transport = InMemoryTransport(lambda request: Response(500))
+    client = SetBit(api_key="test_key", batch_size=10, transport=transport)
+    client.track("purchase", "user_1")
+
+    client.flush()
+
+    assert len(transport.requests) == 1
+
+
+def test_hedged_error_response_does_not_win():
+    """Test a fast 5xx loses the hedge race to a slower successful answer"""
+    calls = []
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            calls.append(request)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.2)
+            return json_response({"enabled": True, "variant": "slow"})
+        return Response(503)
+
+    client = SetBit(
+        api_key="test_key", hedge=True, deadline=1.0, transport=InMemoryTransport(handler)
+    )
+    for _ in range(20):
+        client._latencies.record(0.01)
+
+    assert client.variant("experiment", "user_1") == "slow"
+    assert len(calls) == 2
+
+
+def test_busy_workers_wait_within_deadline():
+    """Test a call waits for a worker but never past its deadline"""
+    release = threading.Event()
+
+    def handler(request):
+        release.wait(2)
+        return json_response({"enabled": True, "variant": "slow"})
+
+    client = SetBit(
+        api_key="test_key", deadline=0.1, max_concurrency=1, transport=InMemoryTransport(handler)
+    )
+    blocked = threading.Thread(target=client.variant, args=("experiment", "user_1"))
+    blocked.start()
+    time.sleep(0.02)
+
+    started = time.monotonic()
+    assert client.variant("experiment", "user_2") == "control"
+    assert time.monotonic() - started < 0.3
+
+    release.set()
+    blocked.join()
+    assert client.variant("experiment", "user_3") == "slow"
+
+
+def test_hedging_serves_more_callers_than_max_concurrency():
+    """Test callers beyond max_concurrency still get the server's answer"""
+    def handler(request):
+        time.sleep(0.01)
+        return json_response({"enabled": True})
+
+    client = SetBit(
+        api_key="test_key", hedge=True, max_concurrency=4, transport=InMemoryTransport(handler)
+    )
+    results = []
+    lock = threading.Lock()
+
+    def caller():
+        for _ in range(10):
+            value = client.enabled("new-feature", "user_1")
+            with lock:
+                results.append(value)
+
+    threads = [threading.Thread(target=caller) for _ in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 320
+    assert all(results)
+
+
+def test_zero_deadline_returns_default_immediately():
+    """Test deadline=0 is honored rather than treated as no deadline"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(_slow_handler(0.5)))
+
+    started = time.monotonic()
+    assert client.enabled("new-feature", "user_1", deadline=0) is False
+    assert time.monotonic() - started < 0.1
+
+
+def test_full_batch_flushed_by_track_is_not_retried():
+    """Test the flush of a full batch inside track() never sleeps in the caller"""
+    transport = InMemoryTransport(lambda request: Response(503))
+    client = SetBit(api_key="test_key", batch_size=2, max_retries=3, transport=transport)
+
+    with patch('setbit.client.time.sleep') as mock_sleep:
+        client.track("purchase", "user_1")
+        client.track("purchase", "user_2")
+
+    assert len(transport.requests) == 2
+    mock_sleep.assert_not_called()
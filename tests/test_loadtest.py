@@ -0,0 +1,140 @@
+"""
+Tests for traffic recording and replay
+"""
+import json
+
+from setbit import SetBit, InMemoryTransport
+from setbit.loadtest import (
+    StubServer, TrafficRecorder, hash_user_id, load_traffic, main, replay,
+)
+from setbit.transport import Response, json_response
+
+
+FLAGS = {
+    "simple-flag": {"enabled": True, "type": "boolean"},
+    "experiment-flag": {
+        "enabled": True,
+        "type": "experiment",
+        "variants": {"control": {"weight": 50}, "variant_a": {"weight": 50}}
+    }
+}
+
+
+def _record(path):
+    recorder = TrafficRecorder(str(path))
+    transport = InMemoryTransport(lambda request: json_response({"enabled": True}))
+    client = SetBit(api_key="test_key", transport=transport, hooks=[recorder])
+
+    client.enabled("simple-flag", "user_1")
+    client.variant("experiment-flag", "user_2")
+    client.track("purchase", "user_1", flag_name="experiment-flag")
+    recorder.close()
+
+
+def test_recorder_writes_hashed_ndjson(tmp_path):
+    """Test recorded calls carry hashed user IDs and call details"""
+    path = tmp_path / "traffic.ndjson"
+    _record(path)
+
+    calls = load_traffic(str(path))
+
+    assert [call["method"] for call in calls] == ["enabled", "variant", "track"]
+    assert calls[0]["user"] == hash_user_id("user_1")
+    assert "user_1" not in path.read_text()
+    assert calls[0]["flag"] == "simple-flag"
+    assert calls[0]["source"] == "network"
+    assert calls[2]["event"] == "purchase"
+
+
+def test_replay_reports_throughput_and_latency(tmp_path):
+    """Test replay drives every call and reports per-method latencies"""
+    path = tmp_path / "traffic.ndjson"
+    _record(path)
+    transport = InMemoryTransport(lambda request: json_response({"enabled": True}))
+    client = SetBit(api_key="test_key", transport=transport, batch_size=10)
+
+    report = replay(load_traffic(str(path)), client, speed=0, threads=2)
+
+    assert report.calls == 3
+    assert report.errors == 0
+    assert set(report.latencies) == {"enabled", "variant", "track"}
+    assert report.throughput > 0
+    assert report.sources == {"network": 2, "queue": 1}
+    assert report.max_queue_depth <= 1
+    assert "p95=" in report.summary()
+
+
+def test_replay_counts_failed_open_calls(tmp_path):
+    """Test calls that fall back to defaults or fail to send count as errors"""
+    path = tmp_path / "traffic.ndjson"
+    _record(path)
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(lambda r: Response(500)))
+
+    report = replay(load_traffic(str(path)), client, speed=0, threads=2)
+
+    assert report.calls == 3
+    assert report.errors == 3
+    assert report.sources == {"default": 2, "network": 1}
+
+
+def test_replay_removes_its_hook():
+    """Test replay leaves the client's hooks as it found them"""
+    records = []
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(), hooks=[records.append])
+    calls = [{"ts": 100.0, "method": "enabled", "flag": "f", "user": "u"}]
+
+    replay(calls, client, speed=0)
+    client.enabled("f", "u")
+
+    assert len(records) == 2
+    assert len(client._tracer.hooks) == 1
+
+
+def test_replay_respects_recorded_timing():
+    """Test calls are spaced as recorded, scaled by speed"""
+    calls = [
+        {"ts": 100.0, "method": "enabled", "flag": "f", "user": "u"},
+        {"ts": 100.2, "method": "enabled", "flag": "f", "user": "u"},
+    ]
+    client = SetBit(api_key="test_key", transport=InMemoryTransport())
+
+    report = replay(calls, client, speed=2.0, threads=1)
+
+    assert 0.09 <= report.elapsed < 0.5
+
+
+def test_stub_server_end_to_end():
+    """Test a real client evaluates and tracks against the stub server"""
+    with StubServer(FLAGS) as server:
+        client = SetBit(
+            api_key="loadtest", base_url=server.url,
+            batch_size=2, batch_format="ndjson", compress_threshold=0
+        )
+
+        assert client.enabled("simple-flag", "user_1") is True
+        assert client.variant("experiment-flag", "user_1") in ["control", "variant_a"]
+        assert client.enabled("missing-flag", "user_1") is False
+        client.track("purchase", "user_1")
+        client.track("purchase", "user_2")
+
+        client.warm_up()
+        assert client.is_ready
+        client.close()
+
+    assert server.requests["/v1/evaluate"] == 3
+    assert server.requests["/v1/flags"] == 1
+    assert server.events_received == 2
+
+
+def test_main_replays_file(tmp_path, capsys):
+    """Test the command line entry point prints a report"""
+    traffic = tmp_path / "traffic.ndjson"
+    _record(traffic)
+    flags = tmp_path / "flags.json"
+    flags.write_text(json.dumps(FLAGS))
+
+    assert main([str(traffic), "--flags", str(flags), "--speed", "0", "--warm-up"]) == 0
+
+    output = capsys.readouterr().out
+    assert "calls: 3" in output
+    assert "snapshot=2" in output
@@ -0,0 +1,126 @@
+"""
+Tests for evaluating one flag across many users
+"""
+import itertools
+import random
+import threading
+import time
+from unittest.mock import patch
+
+from setbit import SetBit, SetBitAPIError, InMemoryTransport
+from setbit.transport import json_response
+
+
+def _variant_handler(delay=0.0):
+    def handler(request):
+        user_id = request.json()["userId"]
+        if delay:
+            time.sleep(random.uniform(0, delay))
+        if user_id == "user_broken":
+            raise SetBitAPIError("connection reset")
+        return json_response({"enabled": True, "variant": f"v_{user_id}"})
+    return handler
+
+
+def test_variant_many_preserves_input_order():
+    """Test results are yielded in input order even when chunks finish out of order"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(_variant_handler(0.005)))
+    user_ids = [f"user_{i}" for i in range(200)]
+
+    results = list(client.variant_many("experiment", user_ids, chunk_size=7, max_workers=4))
+
+    assert results == [(user_id, f"v_{user_id}") for user_id in user_ids]
+
+
+def test_variant_many_fails_open_per_user():
+    """Test a failing user gets the default without affecting the others"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(_variant_handler()))
+
+    results = dict(client.variant_many("experiment", ["user_1", "user_broken", "user_2"]))
+
+    assert results == {"user_1": "v_user_1", "user_broken": "control", "user_2": "v_user_2"}
+
+
+def test_variant_many_custom_default():
+    """Test the default passed to variant_many() is used for failures"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(_variant_handler()))
+
+    results = dict(client.variant_many("experiment", ["user_broken"], default="holdout"))
+
+    assert results == {"user_broken": "holdout"}
+
+
+def test_enabled_many_bounds_concurrency():
+    """Test no more than max_workers requests are in flight at once"""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def handler(request):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.002)
+        with lock:
+            active -= 1
+        return json_response({"enabled": True})
+
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(handler))
+    user_ids = (f"user_{i}" for i in range(100))
+
+    results = list(client.enabled_many("new-email", user_ids, max_workers=3, chunk_size=5))
+
+    assert len(results) == 100
+    assert all(on for _, on in results)
+    assert 1 < peak <= 3
+
+
+def test_enabled_many_streams_unbounded_input():
+    """Test results are produced before the input is exhausted"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport())
+    user_ids = (f"user_{i}" for i in itertools.count())
+
+    first = list(itertools.islice(client.enabled_many("new-email", user_ids), 5))
+
+    assert [user_id for user_id, _ in first] == [f"user_{i}" for i in range(5)]
+
+
+def test_variant_many_uses_snapshot_without_network():
+    """Test snapshot flags are evaluated inline without API calls"""
+    transport = InMemoryTransport()
+    snapshot = {"rollout": {"enabled": True, "type": "rollout", "percentage": 100}}
+    client = SetBit(api_key="test_key", snapshot=snapshot, transport=transport)
+
+    results = list(client.variant_many("rollout", [f"user_{i}" for i in range(50)]))
+
+    assert all(variant == "enabled" for _, variant in results)
+    assert transport.requests == []
+
+
+def test_enabled_many_with_deadline_ignores_max_concurrency():
+    """Test bulk workers beyond max_concurrency get real answers, not defaults"""
+    def handler(request):
+        time.sleep(0.01)
+        return json_response({"enabled": True})
+
+    client = SetBit(
+        api_key="test_key", deadline=1.0, max_concurrency=4, transport=InMemoryTransport(handler)
+    )
+    user_ids = [f"user_{i}" for i in range(64)]
+
+    results = list(client.enabled_many("new-feature", user_ids, chunk_size=1, max_workers=16))
+
+    assert [user_id for user_id, _ in results] == user_ids
+    assert all(on for _, on in results)
+
+
+def test_variant_many_applies_deadline_as_timeout():
+    """Test the client deadline bounds each bulk request's timeout"""
+    transport = InMemoryTransport(_variant_handler())
+    client = SetBit(api_key="test_key", deadline=0.05, transport=transport)
+
+    with patch.object(transport, 'request', wraps=transport.request) as mock_request:
+        list(client.variant_many("experiment", ["user_1", "user_2"]))
+
+    assert all(c[1]["timeout"] == 0.05 for c in mock_request.call_args_list)
@@ -0,0 +1,183 @@
+"""
+Tests for readiness gating, warm-up and snapshot refresh
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from setbit import SetBit, SetBitAuthError, SetBitAPIError, InMemoryTransport
+from setbit.transport import Response, json_response
+
+
+FLAGS = {
+    "simple-flag": {"enabled": True, "type": "boolean"},
+    "experiment-flag": {
+        "enabled": True,
+        "type": "experiment",
+        "variants": {"control": {"weight": 0}, "variant_a": {"weight": 100}}
+    }
+}
+
+
+def _flags_handler(request):
+    if request.url.endswith("/v1/flags"):
+        return json_response(FLAGS)
+    return json_response({"enabled": False})
+
+
+def test_client_is_not_ready_without_flags():
+    """Test a client without flag data reports not ready"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(_flags_handler))
+
+    assert client.is_ready is False
+    assert client.wait_until_ready(timeout=0.01) is False
+
+
+def test_warm_up_loads_snapshot_and_marks_ready():
+    """Test warm_up() loads flags so later checks are answered locally"""
+    transport = InMemoryTransport(_flags_handler)
+    client = SetBit(api_key="test_key", tags={"env": "test"}, transport=transport)
+
+    client.warm_up()
+
+    assert client.is_ready is True
+    assert transport.requests[0].json() == {"apiKey": "test_key", "tags": {"env": "test"}}
+
+    assert client.enabled("simple-flag", "user_1") is True
+    assert client.variant("experiment-flag", "user_1") == "variant_a"
+    assert len(transport.requests) == 1
+
+
+def test_background_warm_up():
+    """Test warm_up=True readies the client without blocking the constructor"""
+    release = threading.Event()
+
+    def handler(request):
+        release.wait(1)
+        return _flags_handler(request)
+
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(handler), warm_up=True)
+
+    assert client.is_ready is False
+    release.set()
+    assert client.wait_until_ready(timeout=1) is True
+
+
+def test_failed_background_warm_up_stays_not_ready():
+    """Test an invalid API key is not retried and the client is not reported ready"""
+    transport = InMemoryTransport(lambda r: Response(401))
+    client = SetBit(api_key="test_key", transport=transport, warm_up=True)
+
+    assert client.wait_until_ready(timeout=0.2) is False
+    assert len(transport.requests) == 1
+
+
+def test_background_warm_up_retries_until_success():
+    """Test transient warm-up failures are retried with backoff"""
+    responses = iter([Response(503), Response(502)])
+
+    def handler(request):
+        return next(responses, None) or _flags_handler(request)
+
+    transport = InMemoryTransport(handler)
+    with patch('setbit.client.backoff_delay', return_value=0.01):
+        client = SetBit(api_key="test_key", transport=transport, warm_up=True)
+        assert client.wait_until_ready(timeout=1) is True
+
+    assert len(transport.requests) == 3
+
+
+def test_background_warm_up_gives_up_after_timeout():
+    """Test the background warm-up stops retrying after warm_up_timeout"""
+    transport = InMemoryTransport(lambda r: Response(503))
+    with patch('setbit.client.backoff_delay', return_value=0.05):
+        client = SetBit(
+            api_key="test_key", transport=transport, warm_up=True, warm_up_timeout=0.2
+        )
+        assert client.wait_until_ready(timeout=0.5) is False
+
+    attempts = len(transport.requests)
+    assert 2 <= attempts <= 5
+    time.sleep(0.1)
+    assert len(transport.requests) == attempts
+
+
+def test_bundled_snapshot_is_ready_immediately():
+    """Test a client created with a snapshot is ready without network calls"""
+    transport = InMemoryTransport(_flags_handler)
+    client = SetBit(api_key="test_key", snapshot=FLAGS, serverless=True, transport=transport)
+
+    assert client.is_ready is True
+    client.warm_up()
+    assert transport.requests == []
+
+
+def test_snapshot_with_warm_up_waits_for_fresh_flags():
+    """Test a bundled snapshot doesn't report ready before a requested warm-up"""
+    release = threading.Event()
+
+    def handler(request):
+        release.wait(1)
+        return _flags_handler(request)
+
+    client = SetBit(
+        api_key="test_key", snapshot={}, transport=InMemoryTransport(handler), warm_up=True
+    )
+
+    assert client.is_ready is False
+    release.set()
+    assert client.wait_until_ready(timeout=1) is True
+
+
+def test_refresh_raises_on_auth_error():
+    """Test refresh() raises SetBitAuthError on 401"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(lambda r: Response(401)))
+
+    with pytest.raises(SetBitAuthError):
+        client.refresh()
+
+
+def test_refresh_raises_on_api_error():
+    """Test refresh() raises SetBitAPIError on other failures"""
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(lambda r: Response(500)))
+
+    with pytest.raises(SetBitAPIError):
+        client.refresh()
+    assert client.is_ready is False
+
+
+def test_background_refresh_picks_up_flag_changes():
+    """Test a flag turned off on the server is picked up after warm_up()"""
+    flags = {"kill-switch": {"enabled": True, "type": "boolean"}}
+
+    def handler(request):
+        return json_response(flags)
+
+    transport = InMemoryTransport(handler)
+    client = SetBit(api_key="test_key", transport=transport, refresh_interval=0.02)
+    client.warm_up()
+    assert client.enabled("kill-switch", "user_1") is True
+
+    flags = {"kill-switch": {"enabled": False, "type": "boolean"}}
+    expires_at = time.monotonic() + 1
+    while client.enabled("kill-switch", "user_1") and time.monotonic() < expires_at:
+        time.sleep(0.01)
+
+    assert client.enabled("kill-switch", "user_1") is False
+
+    client.close()
+    refreshes = len(transport.requests)
+    time.sleep(0.1)
+    assert len(transport.requests) == refreshes
+
+
+def test_refresh_interval_none_freezes_flags():
+    """Test refresh_interval=None keeps the flags loaded by warm_up()"""
+    transport = InMemoryTransport(_flags_handler)
+    client = SetBit(api_key="test_key", transport=transport, refresh_interval=None)
+
+    client.warm_up()
+    time.sleep(0.05)
+
+    assert len(transport.requests) == 1
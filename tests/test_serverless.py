@@ -0,0 +1,164 @@
+"""
+Tests for snapshot evaluation, serverless mode and import cost
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from setbit import SetBit, SetBitError, InMemoryTransport, Snapshot
+from setbit.transport import json_response
+from setbit.utils import hash_bucket
+
+
+SNAPSHOT = {
+    "simple-flag": {"enabled": True, "type": "boolean"},
+    "disabled-flag": {"enabled": False, "type": "boolean"},
+    "full-rollout": {"enabled": True, "type": "rollout", "percentage": 100},
+    "no-rollout": {"enabled": True, "type": "rollout", "percentage": 0},
+    "experiment-flag": {
+        "enabled": True,
+        "type": "experiment",
+        "variants": {"control": {"weight": 50}, "variant_a": {"weight": 50}}
+    }
+}
+
+
+@pytest.fixture
+def transport():
+    return InMemoryTransport(lambda request: json_response({"enabled": True, "variant": "remote"}))
+
+
+@pytest.fixture
+def client(transport):
+    return SetBit(api_key="test_key", snapshot=SNAPSHOT, serverless=True, transport=transport)
+
+
+def test_snapshot_evaluates_without_network(client, transport):
+    """Test flags in the snapshot are evaluated locally"""
+    assert client.enabled("simple-flag", "user_1") is True
+    assert client.enabled("disabled-flag", "user_1") is False
+    assert client.variant("full-rollout", "user_1") == "enabled"
+    assert client.variant("no-rollout", "user_1") == "disabled"
+    assert client.variant("experiment-flag", "user_1") in ["control", "variant_a"]
+    assert client.variant("simple-flag", "user_1", default="off") == "off"
+    assert transport.requests == []
+
+
+def test_snapshot_experiment_assignment_is_sticky(client):
+    """Test a user always gets the same variant from the snapshot"""
+    first = client.variant("experiment-flag", "user_1")
+    assert all(client.variant("experiment-flag", "user_1") == first for _ in range(20))
+
+
+def _reference_assign(variants, identifier):
+    """Linear scan over the weights, as the compiled tables must behave"""
+    total_weight = sum(v.get("weight", 0) for v in variants.values())
+    if total_weight == 0:
+        return list(variants.keys())[0]
+
+    bucket = hash_bucket(identifier, total_weight)
+    cumulative = 0
+    for name, config in variants.items():
+        cumulative += config.get("weight", 0)
+        if bucket < cumulative:
+            return name
+
+
+def test_compiled_assignment_matches_linear_scan():
+    """Test compiled variant tables assign users like a linear weight scan"""
+    variants = {"control": {"weight": 34}, "empty": {"weight": 0}, "variant_a": {"weight": 66}}
+    snapshot = Snapshot({"exp": {"enabled": True, "type": "experiment", "variants": variants}})
+
+    for i in range(500):
+        expected = _reference_assign(variants, f"exp:user_{i}")
+        assert snapshot.evaluate("exp", f"user_{i}")["variant"] == expected
+
+
+def test_serverless_returns_default_for_missing_flag(client, transport):
+    """Test serverless mode never falls back to the network"""
+    assert client.enabled("missing-flag", "user_1", default=True) is True
+    assert client.variant("missing-flag", "user_1") == "control"
+    assert transport.requests == []
+
+
+def test_snapshot_falls_back_to_network_outside_serverless(transport):
+    """Test flags missing from the snapshot are fetched when not serverless"""
+    client = SetBit(api_key="test_key", snapshot=SNAPSHOT, transport=transport)
+
+    assert client.variant("missing-flag", "user_1") == "remote"
+    assert len(transport.requests) == 1
+
+
+def test_snapshot_loads_from_file(tmp_path, transport):
+    """Test a bundled snapshot file can be loaded"""
+    path = tmp_path / "flags.json"
+    path.write_text(json.dumps(SNAPSHOT))
+
+    client = SetBit(api_key="test_key", snapshot=str(path), serverless=True, transport=transport)
+
+    assert client.enabled("simple-flag", "user_1") is True
+
+
+def test_snapshot_load_errors_raise(tmp_path):
+    """Test unreadable snapshots raise SetBitError"""
+    with pytest.raises(SetBitError):
+        SetBit(api_key="test_key", snapshot=str(tmp_path / "missing.json"))
+
+
+def test_serverless_requires_snapshot():
+    """Test serverless mode can't be enabled without a snapshot"""
+    with pytest.raises(SetBitError):
+        SetBit(api_key="test_key", serverless=True)
+
+
+def test_handler_flushes_queued_events(client, transport):
+    """Test events tracked in a handler are sent when it returns"""
+    @client.handler
+    def lambda_handler(event, context):
+        client.track("purchase", event["user_id"])
+        client.track("signup", event["user_id"])
+        assert transport.requests == []
+        return "ok"
+
+    assert lambda_handler({"user_id": "user_1"}, None) == "ok"
+    assert [r.json()["eventName"] for r in transport.requests] == ["purchase", "signup"]
+
+
+# Generous so it only catches regressions such as an eager heavy import
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def _import_setbit():
+    """Import setbit in a fresh interpreter, returning its modules and -X importtime log"""
+    code = "import sys, setbit; print(' '.join(sorted(sys.modules)))"
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, cwd=repo_root
+    )
+    return set(result.stdout.split()), result.stderr
+
+
+def test_import_does_not_load_optional_modules():
+    """Test `import setbit` loads neither requests nor the load-test harness"""
+    modules, _ = _import_setbit()
+
+    assert "requests" not in modules
+    assert "http.server" not in modules
+    assert "setbit.loadtest" not in modules
+
+
+def test_import_time_budget():
+    """Test `import setbit` stays within its cold-start budget"""
+    _, log = _import_setbit()
+
+    # -X importtime lines: "import time: self [us] | cumulative | package"
+    cumulative = {
+        fields[2].strip(): int(fields[1])
+        for fields in (line.split(":", 1)[1].split("|") for line in log.splitlines()
+                       if line.startswith("import time:") and "cumulative" not in line)
+    }
+
+    assert cumulative["setbit"] / 1e6 < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,207 @@
+"""
+Tests for evaluation tracing hooks
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from setbit import SetBit, SetBitAPIError, Hook, InMemoryTransport
+from setbit.transport import Response, json_response
+
+
+def _client(handler=None, **kwargs):
+    records = []
+    transport = InMemoryTransport(handler)
+    client = SetBit(api_key="test_key", transport=transport, hooks=[records.append], **kwargs)
+    return client, records
+
+
+def test_network_evaluation_record():
+    """Test network evaluations report outcome, source and phase timings"""
+    client, records = _client(
+        lambda request: json_response({"enabled": True, "variant": "variant_a"})
+    )
+
+    assert client.variant("pricing-test", "user_1") == "variant_a"
+
+    record = records[0]
+    assert record.method == "variant"
+    assert record.flag_name == "pricing-test"
+    assert record.user_id == "user_1"
+    assert record.value == "variant_a"
+    assert record.source == "network"
+    assert set(record.phases) == {"serialize", "network", "decode"}
+    assert record.duration >= sum(record.phases.values())
+
+
+def test_snapshot_evaluation_record():
+    """Test snapshot evaluations are reported with the snapshot source"""
+    client, records = _client(snapshot={"simple-flag": {"enabled": True}})
+
+    client.enabled("simple-flag", "user_1")
+
+    assert records[0].source == "snapshot"
+    assert list(records[0].phases) == ["snapshot"]
+
+
+def test_default_record_includes_error():
+    """Test fallbacks are reported with the default source and the error"""
+    def handler(request):
+        raise SetBitAPIError("connection refused")
+
+    client, records = _client(handler)
+
+    assert client.enabled("new-feature", "user_1", default=True) is True
+    assert records[0].source == "default"
+    assert records[0].error == "connection refused"
+
+
+def test_server_timing_header_recorded():
+    """Test the Server-Timing header populates the server phase"""
+    headers = {"server-timing": "db;dur=2, app;dur=3"}
+    client, records = _client(lambda request: Response(200, b'{"enabled": true}', headers))
+
+    client.enabled("new-feature", "user_1")
+
+    assert abs(records[0].phases["server"] - 0.005) < 1e-9
+
+
+def test_track_records():
+    """Test track() reports whether events were sent, queued or sampled out"""
+    client, records = _client(sample_rates={"page_view": 0.0})
+
+    client.track("purchase", "user_1", flag_name="checkout")
+    client.track("page_view", "user_1")
+
+    assert records[0].event_name == "purchase"
+    assert records[0].flag_name == "checkout"
+    assert records[0].value == "sent"
+    assert "network" in records[0].phases
+    assert records[1].value == "sampled_out"
+
+    client.batch_size = 10
+    client.track("purchase", "user_1")
+    assert (records[2].value, records[2].source) == ("queued", "queue")
+
+
+def test_hook_before_and_after_share_record():
+    """Test span-style hooks see the same record in before() and after()"""
+    class SpanHook(Hook):
+        def __init__(self):
+            self.events = []
+
+        def before(self, record):
+            record.span = "open"
+            self.events.append(("before", record.value))
+
+        def after(self, record):
+            self.events.append(("after", record.value, record.span))
+
+    hook = SpanHook()
+    client = SetBit(
+        api_key="test_key",
+        transport=InMemoryTransport(lambda request: json_response({"enabled": True})),
+    )
+    client.add_hook(hook)
+
+    client.enabled("new-feature", "user_1")
+
+    assert hook.events == [("before", None), ("after", True, "open")]
+
+
+def test_failing_hook_does_not_break_evaluation():
+    """Test hook errors are logged and the result is still returned"""
+    def broken(record):
+        raise RuntimeError("boom")
+
+    client = SetBit(
+        api_key="test_key",
+        transport=InMemoryTransport(lambda request: json_response({"enabled": True})),
+        hooks=[broken],
+    )
+
+    assert client.enabled("new-feature", "user_1") is True
+
+
+def test_sampling_skips_unsampled_calls():
+    """Test only sampled calls are reported"""
+    client, records = _client(trace_sample_rate=0.5)
+
+    with patch('setbit.tracing.random.random') as rand:
+        rand.return_value = 0.9
+        client.enabled("new-feature", "user_1")
+        rand.return_value = 0.1
+        client.enabled("new-feature", "user_1")
+
+    assert len(records) == 1
+
+
+def test_record_to_attributes():
+    """Test records flatten to OpenTelemetry-style attributes"""
+    client, records = _client(lambda request: json_response({"enabled": True}))
+
+    client.enabled("new-feature", "user_1")
+    attributes = records[0].to_attributes()
+
+    assert attributes["feature_flag.key"] == "new-feature"
+    assert attributes["feature_flag.provider_name"] == "setbit"
+    assert attributes["feature_flag.variant"] == "True"
+    assert attributes["setbit.source"] == "network"
+    assert "setbit.phase.network_ms" in attributes
+
+
+def test_hedged_record_keeps_only_winning_attempt():
+    """Test hedged requests don't both add to the record's phases"""
+    calls = []
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            calls.append(request)
+            first = len(calls) == 1
+        time.sleep(0.3 if first else 0.0)
+        return json_response({"enabled": True, "variant": "slow" if first else "fast"})
+
+    client, records = _client(handler, hedge=True, deadline=1.0)
+    for _ in range(20):
+        client._latencies.record(0.01)
+
+    assert client.variant("experiment", "user_1") == "fast"
+    time.sleep(0.4)
+
+    record = records[0]
+    assert record.source == "network"
+    assert record.phases["network"] < 0.3
+    assert record.duration >= sum(
+        seconds for phase, seconds in record.phases.items() if phase != "server"
+    )
+
+
+def test_record_ignores_writes_after_finish():
+    """Test a request abandoned at the deadline can't change the finished record"""
+    def handler(request):
+        time.sleep(0.2)
+        return json_response({"enabled": True})
+
+    client, records = _client(handler, deadline=0.05)
+
+    assert client.enabled("new-feature", "user_1") is False
+    time.sleep(0.3)
+
+    record = records[0]
+    assert record.source == "default"
+    assert "network" not in record.phases
+    assert "decode" not in record.phases
+
+
+def test_remove_hook():
+    """Test removed hooks, including callables, no longer receive records"""
+    records = []
+    client, _ = _client(snapshot={"simple-flag": {"enabled": True}})
+    client.add_hook(records.append)
+
+    client.enabled("simple-flag", "user_1")
+    client.remove_hook(records.append)
+    client.enabled("simple-flag", "user_1")
+
+    assert len(records) == 1
@@ -0,0 +1,148 @@
+"""
+Tests for HTTP transports
+"""
+import pytest
+from unittest.mock import Mock, patch
+import requests
+from setbit import SetBit, SetBitAPIError, InMemoryTransport, RequestsTransport
+from setbit.transport import Response, Transport, json_response
+
+
+def test_in_memory_transport_records_requests():
+    """Test the in-memory transport records requests and answers via handler"""
+    transport = InMemoryTransport(lambda request: json_response({"enabled": True}))
+    client = SetBit(api_key="test_key", tags={"env": "test"}, transport=transport)
+
+    assert client.enabled("new-feature", "user_1") is True
+
+    request = transport.requests[0]
+    assert request.method == "POST"
+    assert request.url == "https://flags.setbit.io/v1/evaluate"
+    assert request.json() == {
+        "apiKey": "test_key",
+        "userId": "user_1",
+        "tags": {"env": "test"},
+        "flagName": "new-feature"
+    }
+
+
+def test_in_memory_transport_joins_streamed_bodies():
+    """Test streamed bodies are captured as bytes"""
+    transport = InMemoryTransport()
+
+    transport.post("http://localhost/v1/track", data=iter([b"a\n", b"b\n"]))
+
+    assert transport.requests[0].body == b"a\nb\n"
+
+
+def test_response_raise_for_status():
+    """Test unsuccessful responses raise SetBitAPIError"""
+    Response(204).raise_for_status()
+
+    with pytest.raises(SetBitAPIError):
+        Response(500).raise_for_status()
+
+
+def test_transport_errors_fail_open():
+    """Test enabled()/variant() return defaults when the transport fails"""
+    def handler(request):
+        raise SetBitAPIError("connection refused")
+
+    client = SetBit(api_key="test_key", transport=InMemoryTransport(handler))
+
+    assert client.enabled("new-feature", "user_1", default=True) is True
+    assert client.variant("experiment", "user_1") == "control"
+    client.track("purchase", "user_1")
+
+
+def test_requests_transport_reuses_session():
+    """Test RequestsTransport sends through one pooled session"""
+    transport = RequestsTransport()
+
+    with patch.object(transport._get_session(), 'request') as mock_request:
+        mock_request.return_value = Mock(status_code=200, content=b"{}", headers={})
+
+        transport.post("http://localhost/v1/evaluate", json={})
+        transport.post("http://localhost/v1/evaluate", json={})
+
+        assert mock_request.call_count == 2
+
+
+def test_requests_transport_wraps_network_errors():
+    """Test requests exceptions surface as SetBitAPIError"""
+    transport = RequestsTransport()
+
+    with patch.object(transport._get_session(), 'request') as mock_request:
+        mock_request.side_effect = requests.Timeout("timed out")
+
+        with pytest.raises(SetBitAPIError):
+            transport.post("http://localhost/v1/evaluate", json={})
+
+
+def test_requests_transport_preconnect_opens_connections():
+    """Test preconnect() issues one HEAD request per connection"""
+    transport = RequestsTransport(pool_size=4)
+
+    with patch.object(transport._get_session(), 'request') as mock_request:
+        mock_request.return_value = Mock(status_code=404, content=b"", headers={})
+
+        transport.preconnect("http://localhost", connections=3, timeout=0.5)
+
+        assert mock_request.call_count == 3
+        assert all(c[0][0] == "HEAD" for c in mock_request.call_args_list)
+        assert all(c[1]["timeout"] == 0.5 for c in mock_request.call_args_list)
+
+
+def test_transport_requires_request():
+    """Test Transport subclasses must implement request()"""
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_warm_up_passes_client_timeout_to_preconnect():
+    """Test warm_up() preconnects with the client's timeout"""
+    transport = InMemoryTransport(lambda request: json_response({}))
+    client = SetBit(api_key="test_key", transport=transport, timeout=0.25)
+
+    with patch.object(transport, 'preconnect') as mock_preconnect:
+        client.warm_up(connections=2)
+
+    mock_preconnect.assert_called_once_with(client.base_url, 2, timeout=0.25)
+
+
+def test_http2_transport_streams_body_and_passes_headers():
+    """Test HTTP2Transport sends streamed bodies and headers, and maps errors"""
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    from setbit import HTTP2Transport
+
+    received = []
+
+    def handler(request):
+        received.append(request)
+        if request.url.path == "/down":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"ok": True}, headers={"Server-Timing": "db;dur=2"})
+
+    transport = HTTP2Transport()
+    transport._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    response = transport.post(
+        "http://localhost/v1/track",
+        data=iter([b'{"a": 1}\n', b'{"b": 2}\n']),
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "identity"},
+        timeout=1.0
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert response.headers["server-timing"] == "db;dur=2"
+    assert received[0].read() == b'{"a": 1}\n{"b": 2}\n'
+    assert received[0].headers["Content-Type"] == "application/x-ndjson"
+    assert received[0].headers["Content-Encoding"] == "identity"
+
+    with pytest.raises(SetBitAPIError):
+        transport.post("http://localhost/down", data=b"")
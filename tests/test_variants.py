@@ -3,6 +3,7 @@ Tests for variant selection logic
 """
 import pytest
 from collections import Counter
+from setbit import Snapshot
 from setbit.utils import select_variant
 
 
@@ -87,3 +88,31 @@ def test_select_variant_missing_weight():
     # Should handle missing weight gracefully
     results = [select_variant(variants) for _ in range(100)]
     assert "variant_a" in results
+
+
+def _experiment(variants):
+    return Snapshot({"exp": {"enabled": True, "type": "experiment", "variants": variants}})
+
+
+def test_assigned_variant_is_consistent():
+    """Test the same user always gets the same variant"""
+    snapshot = _experiment({
+        "control": {"weight": 50},
+        "variant_a": {"weight": 50}
+    })
+
+    first = snapshot.evaluate("exp", "user_123")["variant"]
+    assert all(snapshot.evaluate("exp", "user_123")["variant"] == first for _ in range(20))
+
+
+def test_assigned_variant_weighted_distribution():
+    """Test consistent assignment still follows weights across users"""
+    snapshot = _experiment({
+        "control": {"weight": 90},
+        "variant_a": {"weight": 10}
+    })
+
+    counts = Counter(snapshot.evaluate("exp", f"user_{i}")["variant"] for i in range(1000))
+
+    assert counts["control"] / 1000 > 0.8
+    assert counts["variant_a"] > 0